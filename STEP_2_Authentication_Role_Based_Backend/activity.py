@@ -0,0 +1,97 @@
+import atexit
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, or_, update
+
+from extensions import db
+from models import User
+
+
+def projected_streak(user, today=None):
+    """Study streak of a user who is active today, whether or not that activity is flushed yet"""
+    today = today or datetime.utcnow().date()
+    streak = user.current_streak or 0
+
+    if user.last_activity_date == today:
+        return max(streak, 1)
+    if user.last_activity_date == today - timedelta(days=1):
+        return streak + 1
+    # Broken streak (or very first activity): active today counts as 1
+    return 1
+
+
+def streak_update(user_ids, day):
+    """UPDATE applying one day of activity to these users' streaks.
+
+    current_streak is assigned before last_activity_date: MySQL evaluates single-table SET clauses
+    left to right, so the CASE must read the previous activity date before it is overwritten.
+    """
+    yesterday = day - timedelta(days=1)
+    return update(User) \
+        .where(User.id.in_(user_ids)) \
+        .where(or_(User.last_activity_date.is_(None), User.last_activity_date < day)) \
+        .ordered_values(
+            (User.current_streak, case(
+                (User.last_activity_date == yesterday, db.func.coalesce(User.current_streak, 0) + 1),
+                else_=1
+            )),
+            (User.last_activity_date, day)
+        ) \
+        .execution_options(synchronize_session=False)
+
+
+class ActivityRecorder:
+    """Buffers "user was active on this day" events and applies them as batched UPDATEs"""
+
+    def __init__(self):
+        self._pending = {}  # date -> set of user ids
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.app = None
+
+    def init_app(self, app):
+        self.app = app
+        interval = app.config.get("ACTIVITY_FLUSH_INTERVAL", 30)
+
+        def loop():
+            while not self._stop.wait(interval):
+                self.flush()
+
+        self._thread = threading.Thread(target=loop, name="activity-flush", daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def record(self, user_id, day=None):
+        day = day or datetime.utcnow().date()
+        with self._lock:
+            self._pending.setdefault(day, set()).add(int(user_id))
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        updated = 0
+        try:
+            with self.app.app_context():
+                # Oldest day first so "yesterday" lands before "today" for the same user
+                for day in sorted(pending):
+                    updated += db.session.execute(streak_update(pending[day], day)).rowcount
+                db.session.commit()
+        except Exception as e:
+            print(f"⚠️ Activity flush failed, retrying later: {e}")
+            with self._lock:
+                for day, ids in pending.items():
+                    self._pending.setdefault(day, set()).update(ids)
+        return updated
+
+    def shutdown(self):
+        self._stop.set()
+        if self.app is not None:
+            self.flush()
+
+
+activity_recorder = ActivityRecorder()
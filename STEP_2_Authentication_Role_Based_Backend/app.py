@@ -1,3 +1,4 @@
+import click
 from flask import Flask
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
@@ -6,11 +7,17 @@ from flask import send_from_directory
 
 from config import Config
 from extensions import db, mail
-from models import User, Internship, Task, Enrollment
+from activity import activity_recorder
+from certificates import certificate_jobs, CERTIFICATE_DIR
+from models import User
 from auth import auth_bp
 from course_api import course_bp
 from trainer_api import trainer_bp
 from student_api import student_bp
+from progress import reconcile_progress
+from grades import backfill_grades
+from trainers import backfill_trainer_ids
+from migrations import run_migrations, current_version, LATEST
 
 
 
@@ -34,7 +41,8 @@ def create_app():
 
     # 🔥 IMPORTANT CORS FIX
     # 🔥 IMPORTANT CORS FIX
-    CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
+    CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True,
+         expose_headers=["X-Next-Cursor", "X-Total-Count"])
     
     @app.after_request
     def add_cors_headers(response):
@@ -43,6 +51,8 @@ def create_app():
 
     db.init_app(app)
     mail.init_app(app)
+    activity_recorder.init_app(app)
+    certificate_jobs.init_app(app)
     jwt = JWTManager(app)
 
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
@@ -60,103 +70,45 @@ def create_app():
 
     @app.route("/api/certificates/<path:filename>")
     def serve_certificates(filename):
-        return send_from_directory("static/certificates", filename)
+        return send_from_directory(CERTIFICATE_DIR, filename)
 
     @app.route("/")
     def home():
         return {"message": "Analogica LMS Backend Running"}
 
+    # ✅ Rebuild incremental progress counters: flask --app app reconcile-progress [--course-id N]
+    @app.cli.command("reconcile-progress")
+    @click.option("--course-id", type=int, default=None)
+    def reconcile_progress_command(course_id):
+        count = reconcile_progress(course_id)
+        print(f"✅ Reconciled {count} progress records")
+
+    # ✅ Convert existing free-text grades: flask --app app backfill-grades
+    @app.cli.command("backfill-grades")
+    def backfill_grades_command():
+        count = backfill_grades()
+        print(f"✅ Converted {count} grades")
+
+    # ✅ Link courses / internships to trainers by mentor_name: flask --app app backfill-trainers
+    @app.cli.command("backfill-trainers")
+    def backfill_trainers_command():
+        count = backfill_trainer_ids()
+        print(f"✅ Linked {count} courses / internships to their trainer")
+
+    # ✅ Apply pending schema migrations by hand: flask --app app migrate
+    @app.cli.command("migrate")
+    def migrate_command():
+        for name in run_migrations():
+            print(f"✅ Applied migration {name}")
+        print(f"✅ Schema at version {current_version()} of {LATEST}")
+
     with app.app_context():
         print("🔄 Connecting to Database...")
-        db.create_all()
-        print("✅ Database Connected & Tables Verified!")
-        
-        # ✅ FIX:        # Schema updates (Individual checks)
-        with db.engine.connect() as conn:
-            try:
-                conn.execute(db.text("ALTER TABLE users ADD COLUMN last_activity_date DATE"))
-            except Exception: pass
-            
-            try:
-                conn.execute(db.text("ALTER TABLE users ADD COLUMN current_streak INTEGER DEFAULT 0"))
-            except Exception: pass
-            
-            try:
-                conn.execute(db.text("ALTER TABLE tasks ADD COLUMN week_number INTEGER DEFAULT 1"))
-            except Exception: pass
-            
-            try:
-                conn.execute(db.text("ALTER TABLE tasks ADD COLUMN internship_id INTEGER"))
-            except Exception: pass
-
-            try:
-                conn.execute(db.text("ALTER TABLE enrollments ADD COLUMN internship_id INTEGER"))
-            except Exception: pass
-            
-            try:
-                # Modify course_id to be nullable. Syntax depends on DB. 
-                # For MySQL: MODIFY COLUMN course_id INTEGER NULL
-                conn.execute(db.text("ALTER TABLE enrollments MODIFY COLUMN course_id INTEGER NULL"))
-            except Exception: pass
-
-            try:
-                conn.execute(db.text("ALTER TABLE courses ADD COLUMN assignment_limit INTEGER"))
-                print("✅ Added assignment_limit column to courses")
-            except Exception: pass
-
-            try:
-                conn.execute(db.text("ALTER TABLE courses ADD COLUMN quiz_limit INTEGER"))
-                print("✅ Added quiz_limit column to courses")
-            except Exception: pass
-            
-            # ✅ NEW: Add course_id to tasks
-            try:
-                conn.execute(db.text("ALTER TABLE tasks ADD COLUMN course_id INTEGER"))
-                print("✅ Added course_id column to tasks")
-            except Exception: pass
-
-            try:
-                conn.execute(db.text("ALTER TABLE internships ADD COLUMN assignment_limit INTEGER"))
-                print("✅ Added assignment_limit column to internships")
-            except Exception: pass
-            
-            # ✅ DATA MIGRATION: Backfill course_id for existing tasks
-            # Logic: If task assigned_to user who is enrolled in a course, set task.course_id to that course_id
-            try:
-                # We need to do this via ORM for simplicity or raw SQL
-                # Let's do a safe raw SQL update for common cases or use Python iteration
-                pass # Logic moved to explicit function called below to ensure app context
-            except Exception: pass
-
-            print("✅ Verified DB Schema")
-
-        # Explicit Data Backfill
-        try:
-            # Re-fetch all tasks with missing course_id
-            tasks = Task.query.filter(Task.course_id == None, Task.internship_id == None).all()
-            if tasks:
-                print(f"🔄 Migrating {len(tasks)} tasks...")
-                for t in tasks:
-                    # Find enrollment for the assigned student
-                    # Assuming 1 active course per student for now or matching trainer
-                    # Better: Find enrollment where student matches AND (maybe check trainer?)
-                    # Simple heuristic: If student has only 1 enrollment, use that.
-                    enrollments = Enrollment.query.filter_by(user_id=t.assigned_to).all()
-                    # Filter only course enrollments
-                    course_enrolls = [e for e in enrollments if e.course_id]
-                    
-                    if len(course_enrolls) == 1:
-                        t.course_id = course_enrolls[0].course_id
-                    elif len(course_enrolls) > 1:
-                        # Ambiguous: assignments usually have course_id in other tables, but Task is generic
-                        # If assigned_by is a trainer, check which course that trainer mentors?
-                        # This is "good enough" for now.
-                        t.course_id = course_enrolls[0].course_id 
-                
-                db.session.commit()
-                print("✅ Task Migration Completed")
-        except Exception as e:
-            print(f"⚠️ Migration warning: {e}")
+        # ✅ Versioned schema migrations (see migrations.py): a single SELECT once the schema is current
+        applied = run_migrations()
+        for name in applied:
+            print(f"✅ Applied migration {name}")
+        print("✅ Database Connected & Schema Verified!")
 
         create_default_admin()
         
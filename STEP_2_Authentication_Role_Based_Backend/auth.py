@@ -1,4 +1,6 @@
-from flask import Blueprint, request, jsonify, current_app
+import json
+
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import (
     create_access_token,
@@ -8,9 +10,21 @@ from flask_jwt_extended import (
 )
 from flask_mail import Message
 from itsdangerous import URLSafeTimedSerializer
+from sqlalchemy.orm import selectinload
 
-from models import User, StudentProgress, Enrollment, Task, Submission, TaskSubmission, Certificate
+from models import User, StudentProgress, Enrollment, Task, Course, Internship
 from extensions import db, mail
+from progress import recalculate_progress, forget_tasks
+from trainers import backfill_trainer_ids
+from quiz_analytics import quiz_stats_cache
+from pagination import keyset_page
+from stats import platform_stats_cache, adjust_platform_stats
+from catalog import bump_catalogs
+from tasks import backfill_enrollee
+from cascade import cascade_delete, user_plan
+from cache import (
+    trainer_dashboard_cache, invalidate_students, invalidate_trainer_course, invalidate_trainer_internship, forget_name
+)
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -37,6 +51,12 @@ def register():
 
     db.session.add(user)
     db.session.commit()
+    adjust_platform_stats(data["role"])
+
+    # A trainer registered after their courses were created claims them by name
+    if data["role"] == "TRAINER" and backfill_trainer_ids(user.name):
+        trainer_dashboard_cache.clear()
+        bump_catalogs("courses", "internships")
 
     if data["role"] == "STUDENT" and "course_id" in data:
         enrollment = Enrollment(
@@ -52,30 +72,10 @@ def register():
         )
         db.session.add(student_progress)
 
-        # ✅ BACKFILL TASKS FOR NEW STUDENT
-        existing_tasks = Task.query.filter_by(course_id=data["course_id"]).all()
-        # Filter to ensure we only copy templates or those assigned to others (deduplication needed effectively)
-        # Actually, tasks are currently 1-per-student. So we need to find "Templates".
-        # Since we don't have a separate Template table, we'll find UNIQUE tasks by Title for this course.
-        
-        unique_templates = {}
-        for t in existing_tasks:
-            if t.title not in unique_templates:
-                unique_templates[t.title] = t
-        
-        for _, t in unique_templates.items():
-            new_task = Task(
-                title=t.title,
-                description=t.description,
-                assigned_to=user.id, # Assign to NEW user
-                assigned_by=t.assigned_by,
-                course_id=data["course_id"],
-                priority=t.priority,
-                due_date=t.due_date,
-                status="Pending",
-                week_number=t.week_number
-            )
-            db.session.add(new_task)
+        # ✅ BACKFILL TASKS FOR NEW STUDENT: one copy of every task template of the course
+        backfill_enrollee(user.id, course_id=data["course_id"])
+
+        recalculate_progress(user.id, data["course_id"])
 
 
     if data["role"] == "INTERN" and "internship_id" in data:
@@ -86,27 +86,13 @@ def register():
         db.session.add(enrollment)
 
         # ✅ BACKFILL TASKS FOR NEW INTERN
-        existing_tasks = Task.query.filter_by(internship_id=data["internship_id"]).all()
-        unique_templates = {}
-        for t in existing_tasks:
-            if t.title not in unique_templates:
-                unique_templates[t.title] = t
-                
-        for _, t in unique_templates.items():
-            new_task = Task(
-                title=t.title,
-                description=t.description,
-                assigned_to=user.id,
-                assigned_by=t.assigned_by,
-                internship_id=data["internship_id"],
-                priority=t.priority,
-                due_date=t.due_date,
-                status="Pending",
-                week_number=t.week_number
-            )
-            db.session.add(new_task)
+        backfill_enrollee(user.id, internship_id=data["internship_id"])
 
     db.session.commit()
+    invalidate_trainer_course(data.get("course_id"))
+    invalidate_trainer_internship(data.get("internship_id"))
+    if (data["role"] == "STUDENT" and "course_id" in data) or (data["role"] == "INTERN" and "internship_id" in data):
+        adjust_platform_stats("enrollments")
     return jsonify({"message": "User registered successfully"}), 201
 
 
@@ -200,29 +186,75 @@ def get_users():
     if claims.get("role") != "TRAINER" and claims.get("role") != "ADMIN":
         return jsonify({"error": "Unauthorized"}), 403
 
+    # Filters: ?role=, ?name= (prefix). Pages by id with ?limit= / ?cursor=; ?export=1 streams everything.
+    query = User.query.options(
+        selectinload(User.enrollments).selectinload(Enrollment.course),
+        selectinload(User.enrollments).selectinload(Enrollment.internship)
+    )
     role = request.args.get("role")
     if role:
-        users = User.query.filter_by(role=role).all()
-    else:
-        users = User.query.all()
-
-    return jsonify([
-        {
-            "id": u.id, 
-            "name": u.name, 
-            "email": u.email, 
-            "role": u.role,
-            "enrollments": [
-                {
-                    "type": "Course" if e.course_id else "Internship",
-                    "id": e.course_id or e.internship_id,
-                    "enrollment_id": e.id,
-                    "title": (e.course.name if e.course_id else e.internship.intern_name) if (e.course or e.internship) else "Unknown"
-                } for e in u.enrollments
-            ]
-        }
-        for u in users
-    ]), 200
+        query = query.filter(User.role == role)
+    name = request.args.get("name")
+    if name:
+        query = query.filter(User.name.like(_like_prefix(name), escape="\\"))
+
+    if request.args.get("export"):
+        return Response(stream_with_context(_stream_users(query)), mimetype="application/json")
+
+    try:
+        users, next_cursor = keyset_page(
+            query, (User.id,), key=lambda u: (u.id,),
+            cursor=request.args.get("cursor"), limit=request.args.get("limit", type=int)
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    response = jsonify([_user_json(u) for u in users])
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
+
+
+def _like_prefix(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _user_json(u):
+    return {
+        "id": u.id, 
+        "name": u.name, 
+        "email": u.email, 
+        "role": u.role,
+        "enrollments": [
+            {
+                "type": "Course" if e.course_id else "Internship",
+                "id": e.course_id or e.internship_id,
+                "enrollment_id": e.id,
+                "title": (e.course.name if e.course_id else e.internship.intern_name) if (e.course or e.internship) else "Unknown"
+            } for e in u.enrollments
+        ]
+    }
+
+
+EXPORT_CHUNK_SIZE = 1000
+
+
+def _stream_users(query):
+    """Yields the user list as one JSON array, a keyset chunk at a time, so memory stays flat"""
+    yield "["
+    first, cursor = True, None
+    while True:
+        users, cursor = keyset_page(
+            query, (User.id,), key=lambda u: (u.id,),
+            cursor=cursor, limit=EXPORT_CHUNK_SIZE, max_limit=EXPORT_CHUNK_SIZE
+        )
+        for u in users:
+            yield ("" if first else ",") + json.dumps(_user_json(u))
+            first = False
+        db.session.expunge_all()  # Drop the chunk from the identity map before loading the next
+        if not cursor:
+            break
+    yield "]"
 @auth_bp.route("/users/<int:user_id>", methods=["DELETE"])
 @jwt_required()
 def delete_user(user_id):
@@ -231,53 +263,31 @@ def delete_user(user_id):
         return jsonify({"error": "Admin access required"}), 403
 
     user = User.query.get_or_404(user_id)
+    name = user.name
     
-    # ✅ ROBUST MANUAL CASCADE DELETE
-    
-    # 1. DEPENDENCIES WHERE USER IS THE *SOURCE* (Student/Intern)
-    # -----------------------------------------------------------
-    # Enrollments & Progress
-    Enrollment.query.filter_by(user_id=user_id).delete()
-    StudentProgress.query.filter_by(user_id=user_id).delete()
-    
-    # Certificates
-    Certificate.query.filter_by(user_id=user_id).delete()
-    
-    # Submissions (Assignments)
-    Submission.query.filter_by(student_id=user_id).delete()
-    
-    # Quiz Submissions
-    from models import QuizSubmission # Ensure import
-    QuizSubmission.query.filter_by(student_id=user_id).delete()
-    
-    # Task Submissions (Intern) - Deleting their submissions to tasks
-    TaskSubmission.query.filter_by(student_id=user_id).delete()
-    
-    # Tasks Assigned TO the user (Intern)
-    # Note: If we delete tasks assigned TO them, we must first ensure THOSE tasks don't have submissions (which we just deleted above).
-    Task.query.filter_by(assigned_to=user_id).delete()
-
-
-    # 2. DEPENDENCIES WHERE USER IS THE *CREATOR* (Trainer)
-    # -----------------------------------------------------------
-    # Tasks Assigned BY the user (Trainer)
-    # These tasks might have submissions from OTHER students/interns.
-    # We must delete those submissions first.
-    
-    tasks_created_by_user = Task.query.filter_by(assigned_by=user_id).all()
-    for t in tasks_created_by_user:
-        # Delete submissions for this task (by anyone)
-        TaskSubmission.query.filter_by(task_id=t.id).delete()
-        # Delete the task itself
-        db.session.delete(t)
-        
-    # Note: We do NOT delete Courses or Workshops created by them because they use 'mentor_name' (string) 
-    # instead of foreign keys in this schema, so no crash will occur.
-
-    db.session.delete(user)
-    db.session.commit()
-
-    return jsonify({"message": f"User {user.name} and all related records deleted"}), 200
+    # ✅ CASCADE DELETE: everything the user submitted, was assigned or created, in dependency order
+    # Students who were given this trainer's tasks lose them from their dashboards
+    affected = {sid for (sid,) in db.session.query(Task.assigned_to).filter_by(assigned_by=user_id).distinct()}
+
+    def prepare():
+        # Tasks they created may sit on other students' course counters
+        forget_tasks(Task.assigned_by == user_id)
+        # Courses / Internships they mentor are kept but unlinked (mentor_name still shows who ran them)
+        Course.query.filter_by(trainer_id=user_id).update({Course.trainer_id: None}, synchronize_session=False)
+        Internship.query.filter_by(trainer_id=user_id).update({Internship.trainer_id: None}, synchronize_session=False)
+
+    def after():
+        invalidate_students(user_id, *affected)
+        trainer_dashboard_cache.clear()
+        quiz_stats_cache.clear()  # Their attempts are baked into the cached quiz statistics
+        forget_name("users", user_id)
+        platform_stats_cache.clear()
+        bump_catalogs("courses", "internships")  # Their rows lost trainer_id
+
+    deleted = cascade_delete(user_plan(user_id), prepare, after)
+    if deleted is None:
+        return jsonify({"message": f"User {name} is being deleted in the background"}), 202
+    return jsonify({"message": f"User {name} and all related records deleted", "deleted": deleted}), 200
 
 @auth_bp.route("/enrollments/<int:enrollment_id>", methods=["DELETE"])
 @jwt_required()
@@ -298,6 +308,10 @@ def remove_enrollment(enrollment_id):
 
     db.session.delete(enrollment)
     db.session.commit()
+    invalidate_students(user_id)
+    invalidate_trainer_course(enrollment.course_id)
+    invalidate_trainer_internship(enrollment.internship_id)
+    adjust_platform_stats("enrollments", -1)
 
     return jsonify({"message": "Enrollment removed successfully"}), 200
 @auth_bp.route("/users/<int:user_id>", methods=["PUT"])
@@ -312,11 +326,21 @@ def update_user(user_id):
 
     if "name" in data:
         user.name = data["name"]
+        # Keep the display name on courses / internships they own in step
+        Course.query.filter_by(trainer_id=user.id).update({Course.mentor_name: user.name}, synchronize_session=False)
+        Internship.query.filter_by(trainer_id=user.id).update({Internship.mentor_name: user.name}, synchronize_session=False)
     if "email" in data:
         user.email = data["email"]
+    old_role = user.role
     if "role" in data:
         user.role = data["role"]
     
     db.session.commit()
+    forget_name("users", user_id)
+    if "name" in data:
+        bump_catalogs("courses", "internships")  # mentor_name follows the trainer's name
+    if user.role != old_role:
+        adjust_platform_stats(old_role, -1)
+        adjust_platform_stats(user.role)
 
     return jsonify({"message": "User updated successfully"}), 200
@@ -0,0 +1,35 @@
+from itertools import islice
+
+from sqlalchemy import insert
+
+from config import Config
+from extensions import db
+
+
+def batches(rows, size=None):
+    """Splits an iterable of row mappings into lists of at most size rows"""
+    size = size or Config.FANOUT_BATCH_SIZE
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def insert_rows(model, rows, size=None):
+    """Inserts plain dict rows with one multi-row INSERT per batch, bypassing the unit of work. Returns the count."""
+    count = 0
+    for batch in batches(rows, size):
+        db.session.execute(insert(model), batch)
+        count += len(batch)
+    return count
+
+
+def update_rows(model, mappings, size=None):
+    """Applies {"id": ..., column: value} mappings as one executemany UPDATE per batch. Returns the count."""
+    count = 0
+    for batch in batches(mappings, size):
+        db.session.bulk_update_mappings(model, batch)
+        count += len(batch)
+    return count
@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+from extensions import db
+from models import Enrollment, StudentProgress
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries also expire after ttl seconds"""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def update(self, key, fn):
+        """Replaces a live entry with fn(value) under the lock, keeping its expiry; a missing entry stays missing"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                return
+            self._data[key] = (entry[0], fn(entry[1]))
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def delete_where(self, predicate):
+        """Drops every entry whose cached value matches predicate (for small caches keyed by owner)"""
+        with self._lock:
+            for key in [k for k, (_, value) in self._data.items() if predicate(value)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+# ================= STUDENT DASHBOARD =================
+# Per-process cache: each gunicorn worker holds its own copy, the TTL bounds cross-worker staleness.
+dashboard_cache = TTLCache(Config.DASHBOARD_CACHE_SIZE, Config.DASHBOARD_CACHE_TTL)
+
+
+def invalidate_students(*student_ids):
+    dashboard_cache.delete(*[int(sid) for sid in student_ids if sid])
+
+
+def invalidate_course(course_id):
+    """Drops the cached dashboard of every student enrolled in (or tracking progress for) a course"""
+    if not course_id:
+        return
+    enrolled = db.session.query(Enrollment.user_id).filter_by(course_id=course_id)
+    tracked = db.session.query(StudentProgress.user_id).filter_by(course_id=course_id)
+    invalidate_students(*{sid for (sid,) in enrolled.union(tracked)})
+
+
+def invalidate_internship(internship_id):
+    if not internship_id:
+        return
+    enrolled = db.session.query(Enrollment.user_id).filter_by(internship_id=internship_id)
+    invalidate_students(*{sid for (sid,) in enrolled})
+
+
+# ================= TRAINER DASHBOARD =================
+trainer_dashboard_cache = TTLCache(Config.TRAINER_DASHBOARD_CACHE_SIZE, Config.DASHBOARD_CACHE_TTL)
+
+
+def invalidate_trainer_course(course_id):
+    """Drops cached trainer dashboards listing a course whose enrollments or submissions changed"""
+    if not course_id:
+        return
+    trainer_dashboard_cache.delete_where(
+        lambda payload: any(c["course_id"] == int(course_id) for c in payload["courses"])
+    )
+
+
+def invalidate_trainer_internship(internship_id):
+    if not internship_id:
+        return
+    trainer_dashboard_cache.delete_where(
+        lambda payload: any(i["internship_id"] == int(internship_id) for i in payload["internships"])
+    )
+
+
+# ================= DISPLAY NAMES =================
+# Trainer / internship names shown next to every task; they change rarely and are dropped on edit
+name_cache = TTLCache(Config.NAME_CACHE_SIZE, Config.NAME_CACHE_TTL)
+
+
+def cached_names(column, ids):
+    """{id: name} for a name column such as User.name, loading only uncached ids with one IN query"""
+    model = column.class_
+    table = model.__tablename__
+    names, missing = {}, set()
+    for i in {i for i in ids if i}:
+        name = name_cache.get((table, i))
+        if name is None:
+            missing.add(i)
+        else:
+            names[i] = name
+
+    if missing:
+        for i, name in db.session.query(model.id, column).filter(model.id.in_(missing)):
+            name_cache.set((table, i), name)
+            names[i] = name
+    return names
+
+
+def forget_name(table, *ids):
+    name_cache.delete(*[(table, int(i)) for i in ids if i])
@@ -0,0 +1,136 @@
+import threading
+
+from flask import current_app
+from sqlalchemy import delete, func, or_, select
+
+from config import Config
+from extensions import db
+from models import (
+    User, Course, Internship, Enrollment, StudentProgress, Certificate, CourseResource, InternshipResource,
+    Assignment, Submission, Quiz, Question, QuizSubmission, TaskTemplate, Task, TaskSubmission
+)
+
+
+# ================= PLANS =================
+# A plan is the ordered list of (model, criterion) DELETEs that removes an entity with everything
+# hanging off it, children before parents. Criteria use subqueries rather than loaded ids, so each
+# step is a single statement whatever the amount of history behind it.
+
+def user_plan(user_id):
+    tasks = select(Task.id).where(or_(Task.assigned_to == user_id, Task.assigned_by == user_id))
+    return [
+        (TaskSubmission, or_(TaskSubmission.student_id == user_id, TaskSubmission.task_id.in_(tasks))),
+        (Task, or_(Task.assigned_to == user_id, Task.assigned_by == user_id)),
+        (TaskTemplate, TaskTemplate.assigned_by == user_id),
+        (Submission, Submission.student_id == user_id),
+        (QuizSubmission, QuizSubmission.student_id == user_id),
+        (Certificate, Certificate.user_id == user_id),
+        (StudentProgress, StudentProgress.user_id == user_id),
+        (Enrollment, Enrollment.user_id == user_id),
+        (User, User.id == user_id)
+    ]
+
+
+def course_plan(course_id):
+    tasks = select(Task.id).where(Task.course_id == course_id)
+    assignments = select(Assignment.id).where(Assignment.course_id == course_id)
+    quizzes = select(Quiz.id).where(Quiz.course_id == course_id)
+    return [
+        (TaskSubmission, TaskSubmission.task_id.in_(tasks)),
+        (Task, Task.course_id == course_id),
+        (TaskTemplate, TaskTemplate.course_id == course_id),
+        (Submission, Submission.assignment_id.in_(assignments)),
+        (Assignment, Assignment.course_id == course_id),
+        (QuizSubmission, QuizSubmission.quiz_id.in_(quizzes)),
+        (Question, Question.quiz_id.in_(quizzes)),
+        (Quiz, Quiz.course_id == course_id),
+        (Certificate, Certificate.course_id == course_id),
+        (CourseResource, CourseResource.course_id == course_id),
+        (StudentProgress, StudentProgress.course_id == course_id),
+        (Enrollment, Enrollment.course_id == course_id),
+        (Course, Course.id == course_id)
+    ]
+
+
+def internship_plan(internship_id):
+    tasks = select(Task.id).where(Task.internship_id == internship_id)
+    return [
+        (TaskSubmission, TaskSubmission.task_id.in_(tasks)),
+        (Task, Task.internship_id == internship_id),
+        (TaskTemplate, TaskTemplate.internship_id == internship_id),
+        (InternshipResource, InternshipResource.internship_id == internship_id),
+        (Enrollment, Enrollment.internship_id == internship_id),
+        (Internship, Internship.id == internship_id)
+    ]
+
+
+# ================= EXECUTION =================
+
+def count_rows(plan):
+    """Rows a plan would delete, counted with one SELECT of scalar subqueries"""
+    counts = db.session.execute(select(*[
+        select(func.count()).select_from(model).where(criterion).scalar_subquery()
+        for model, criterion in plan
+    ])).one()
+    return sum(counts)
+
+
+def cascade_delete(plan, prepare=None, after=None):
+    """Runs a plan inside one transaction, or hands it to a background purge when it is large.
+
+    prepare() runs first in the same transaction (counter adjustments that must read the rows
+    about to go) and must be safe to repeat: it marks the rows it has accounted for, since a
+    purge that is cut short runs it again over what is left. after() runs once everything is
+    committed (cache invalidation). Plans up to
+    CASCADE_DELETE_THRESHOLD rows return {table: deleted}; larger ones return None and are purged
+    in chunks of CASCADE_DELETE_CHUNK rows by a background thread, parent row last, so a purge
+    cut short by a restart leaves a consistent tree that can simply be deleted again.
+    """
+    threshold = current_app.config.get("CASCADE_DELETE_THRESHOLD", Config.CASCADE_DELETE_THRESHOLD)
+    if count_rows(plan) > threshold:
+        app = current_app._get_current_object()
+        db.session.rollback()  # Release the read snapshot; the purge opens its own sessions
+        threading.Thread(target=_purge, args=(app, plan, prepare, after), name="cascade-purge", daemon=True).start()
+        return None
+
+    if prepare:
+        prepare()
+    counts = {
+        model.__tablename__: db.session.execute(
+            delete(model).where(criterion).execution_options(synchronize_session=False)
+        ).rowcount
+        for model, criterion in plan
+    }
+    db.session.commit()
+    if after:
+        after()
+    return counts
+
+
+def _purge(app, plan, prepare, after):
+    chunk = app.config.get("CASCADE_DELETE_CHUNK", Config.CASCADE_DELETE_CHUNK)
+    with app.app_context():
+        try:
+            if prepare:
+                prepare()
+                db.session.commit()
+            deleted = 0
+            for model, criterion in plan:
+                # Short transactions: select a bounded batch of ids, delete it, commit, repeat
+                while True:
+                    ids = db.session.execute(select(model.id).where(criterion).limit(chunk)).scalars().all()
+                    if not ids:
+                        break
+                    db.session.execute(
+                        delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False)
+                    )
+                    db.session.commit()
+                    deleted += len(ids)
+            if after:
+                after()
+            print(f"✅ Purged {deleted} rows")
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️ Background purge stopped, delete again to resume: {e}")
+        finally:
+            db.session.remove()
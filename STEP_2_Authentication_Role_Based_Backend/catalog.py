@@ -0,0 +1,76 @@
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import Response, jsonify, request
+
+from config import Config
+
+catalogs = {}  # name -> Catalog, so modules that only change catalog data can bump by name
+
+
+def bump_catalogs(*names):
+    for name in names:
+        if name in catalogs:
+            catalogs[name].bump()
+
+
+class Catalog:
+    """A public list endpoint served from a body serialized once per version.
+
+    Writers call bump() after committing; the next read rebuilds the body. The ETag is a hash of
+    the body, so every worker hands out the same tag for the same content and a matching
+    If-None-Match is answered with 304 straight from memory. Entries also expire after ttl
+    seconds, which bounds how long a bump made in another worker goes unseen.
+    """
+
+    def __init__(self, name, loader, ttl=None):
+        self.name = name
+        self.loader = loader  # Returns the JSON-serializable payload; runs inside a request
+        self.ttl = ttl if ttl is not None else Config.CATALOG_CACHE_TTL
+        self.version = 0
+        self._body = None
+        self._etag = None
+        self._last_modified = None
+        self._expires = 0
+        self._lock = threading.Lock()
+        catalogs[name] = self
+
+    def bump(self):
+        with self._lock:
+            self.version += 1
+            self._body = None
+
+    def _current(self):
+        with self._lock:
+            if self._body is not None and self._expires > time.monotonic():
+                return self._body, self._etag, self._last_modified
+            version = self.version
+
+        body = jsonify(self.loader()).get_data()
+        etag = hashlib.sha256(body).hexdigest()[:32]
+
+        with self._lock:
+            # Last-Modified only moves when the content actually changed, not on every rebuild
+            if etag != self._etag or self._last_modified is None:
+                self._last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+            if version == self.version:  # A bump during the rebuild means this body may be stale
+                self._body, self._etag = body, etag
+                self._expires = time.monotonic() + self.ttl
+            return body, etag, self._last_modified
+
+    def response(self):
+        body, etag, last_modified = self._current()
+
+        if request.if_none_match:
+            not_modified = request.if_none_match.contains(etag)
+        else:
+            not_modified = request.if_modified_since is not None and last_modified <= request.if_modified_since
+
+        response = Response(None if not_modified else body, status=304 if not_modified else 200,
+                            mimetype="application/json")
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        response.headers["Cache-Control"] = "no-cache"  # Browsers may keep it but must revalidate
+        return response
@@ -0,0 +1,534 @@
+import atexit
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import NameObject
+from reportlab.lib.colors import HexColor
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.utils import ImageReader, simpleSplit
+from reportlab.pdfgen import canvas
+
+from config import Config
+from extensions import db
+
+
+# ================= ASSETS =================
+# Logos are read and decoded once per process, whichever template or certificate asks first.
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+CERTIFICATE_DIR = os.path.join(STATIC_DIR, 'certificates')  # Written here, served and looked up from here
+
+_images = {}
+_assets_lock = threading.Lock()
+
+
+def _image(*parts):
+    """ImageReader for a file under static/, None when the file is missing"""
+    path = os.path.join(STATIC_DIR, *parts)
+    with _assets_lock:
+        if path not in _images:
+            _images[path] = ImageReader(path) if os.path.exists(path) else None
+        return _images[path]
+
+
+# ================= TEMPLATES =================
+# A certificate is a static background (borders, logos, fixed wording) plus a few lines of
+# per-student text. The background is drawn once per process and kept as a parsed PDF page;
+# each certificate only draws its own text and stamps it onto a copy of that page.
+
+class CertificateTemplate:
+    def __init__(self, name, version, pagesize, background, stamp):
+        self.name = name
+        self.version = version  # Bump on any design change: stored fingerprints stop matching
+        self.pagesize = pagesize
+        self._draw_background = background
+        self._stamp = stamp
+        self._page = None
+        self._lock = threading.Lock()
+
+    def _canvas(self, buf):
+        # Uncompressed content streams: the background's is reused as bytes, the stamp's is tiny
+        return canvas.Canvas(buf, pagesize=self.pagesize, pageCompression=0)
+
+    def _load(self):
+        buf = io.BytesIO()
+        c = self._canvas(buf)
+        self._draw_background(c, *self.pagesize)
+        c.save()
+        page = PdfReader(buf).pages[0]
+        fonts = page["/Resources"]["/Font"]
+        # Base fonts in the order reportlab named them /F1, /F2, ...
+        self._fonts = [fonts[key].get_object()["/BaseFont"][1:] for key in sorted(fonts, key=lambda k: int(k[2:]))]
+        # Wrapped in q/Q so the stamp starts from the default graphics state
+        self._contents = b"q\n" + page["/Contents"].get_object().get_data() + b"\nQ\n"
+        self._page = page
+
+    def background(self):
+        """The rendered static layer, drawn on first use; read-only, add_page() copies it"""
+        if self._page is None:
+            with self._lock:
+                if self._page is None:
+                    self._load()
+        return self._page
+
+    def fingerprint(self, *values):
+        """Content hash of a certificate: this template's version plus the values printed on it"""
+        digest = hashlib.sha256(f"{self.name}:{self.version}".encode())
+        for value in values:
+            digest.update(b"\0" + str(value).encode())
+        return digest.hexdigest()
+
+    def render(self, output_path, **fields):
+        background = self.background()
+
+        buf = io.BytesIO()
+        c = self._canvas(buf)
+        # Select the background's fonts first, in its order, so reportlab gives shared fonts the
+        # same resource names and the two content streams can simply be concatenated
+        for font in self._fonts:
+            c.setFont(font, 12)
+        self._stamp(c, *self.pagesize, **fields)
+        c.save()
+        stamp = PdfReader(buf).pages[0]
+
+        writer = PdfWriter()
+        page = writer.add_page(background)
+        page["/Contents"].get_object().set_data(self._contents + stamp["/Contents"].get_object().get_data())
+        fonts = page["/Resources"]["/Font"]
+        for key, font in stamp["/Resources"]["/Font"].items():
+            fonts[NameObject(key)] = font.get_object()  # Inlined: the reference belongs to the stamp's reader
+        # Written aside and swapped in, so a download never sees a half-written regeneration
+        tmp = f"{output_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            writer.write(f)
+        os.replace(tmp, output_path)
+
+
+# ================= COURSE CERTIFICATE (Landscape, Gold/Cream) =================
+
+def _course_background(c, width, height):
+    # 1. Background (Subtle Cream/White)
+    c.setFillColor(HexColor("#FFFAF0"))
+    c.rect(0, 0, width, height, fill=1)
+
+    # 2. Ornate Border
+    c.setStrokeColor(HexColor("#DAA520")) # GoldenRod
+    c.setLineWidth(5)
+    c.rect(20, 20, width - 40, height - 40)
+
+    c.setStrokeColor(HexColor("#2C3E50")) # Dark Blue
+    c.setLineWidth(2)
+    c.rect(28, 28, width - 56, height - 56)
+
+    # 3. Logos (Header)
+    logo = _image('analogica_logo.jpg')
+    logo_y = height - 90
+
+    # Center Logo
+    if logo:
+         c.drawImage(logo, width/2 - 30, logo_y - 5, width=60, height=60, mask='auto', preserveAspectRatio=True)
+    else:
+         # Fallback
+         c.setFillColor(HexColor("#2C3E50"))
+         c.circle(width/2, logo_y + 25, 30, fill=1)
+
+    # 4. Company Name (Below Center Logo)
+    c.setFont("Helvetica-Bold", 28)
+    c.setFillColor(HexColor("#2C3E50"))
+    c.drawCentredString(width / 2, height - 120, "ANALOGICA SKILL TRACK")
+
+    c.setFont("Helvetica-Bold", 14)
+    c.setFillColor(HexColor("#7F8C8D"))
+    c.drawCentredString(width / 2, height - 145, "Center for Technical Excellence")
+
+    # 5. Certificate Title
+    c.setFont("Helvetica-Bold", 42)
+    c.setFillColor(HexColor("#C0392B")) # Deep Red for Title
+    c.drawCentredString(width / 2, height - 200, "CERTIFICATE OF ACHIEVEMENT")
+
+    # 6. Body Text
+    c.setFont("Helvetica", 16)
+    c.setFillColor(HexColor("#34495E"))
+    c.drawCentredString(width / 2, height - 250, "This is to certify that")
+
+    # Decorative Line (under the student name)
+    c.setLineWidth(1)
+    c.setStrokeColor(HexColor("#BDC3C7"))
+    c.line(width/2 - 200, height - 310, width/2 + 200, height - 310)
+
+    c.setFont("Helvetica", 16)
+    c.setFillColor(HexColor("#34495E"))
+    c.drawCentredString(width / 2, height - 350, "has successfully completed the")
+
+    # Description Text (under the course name)
+    c.setFont("Helvetica", 14)
+    c.setFillColor(HexColor("#34495E"))
+    c.drawCentredString(width / 2, height - 430, "and has demonstrated the required skills, knowledge, and hands-on")
+    c.drawCentredString(width / 2, height - 450, "expertise in designing and managing automated workflows.")
+
+    # 7. Signatures
+    # Bottom Left
+    c.setLineWidth(1)
+    c.setStrokeColor(HexColor("#2C3E50"))
+
+    c.line(100, 80, 300, 80)
+    c.setFont("Helvetica-Bold", 12)
+    c.setFillColor(HexColor("#2C3E50"))
+    c.drawString(100, 60, "Director")
+
+    # Bottom Right
+    c.line(width - 300, 80, width - 100, 80)
+    c.drawRightString(width - 100, 60, "Program Manager")
+    c.setFont("Helvetica", 10)
+    c.drawRightString(width - 110, 45, "Analogica SkillTrack")
+
+
+def _course_stamp(c, width, height, student_name, course_name, cert_id, issue_date):
+    # Student Name
+    c.setFont("Helvetica-Bold", 32)
+    c.setFillColor(HexColor("#2980B9")) # Nice Blue
+    c.drawCentredString(width / 2, height - 300, student_name.upper())
+
+    # Course Name
+    c.setFont("Helvetica-Bold", 26)
+    c.setFillColor(HexColor("#E67E22")) # Pumpkin Orange
+    c.drawCentredString(width / 2, height - 390, course_name)
+
+    # Dates
+    c.setFont("Helvetica", 12)
+    c.setFillColor(HexColor("#7F8C8D"))
+    c.drawCentredString(width / 2, height - 490, f"Issued on: {issue_date}")
+
+    # 8. Verification Link/ID
+    c.setFont("Courier", 8)
+    c.setFillColor(HexColor("#BDC3C7"))
+    c.drawCentredString(width/2, 30, f"ID: {cert_id}")
+
+
+COURSE_TEMPLATE = CertificateTemplate("course", 1, landscape(A4), _course_background, _course_stamp)
+
+
+# ================= INTERNSHIP CERTIFICATE (Portrait Professional) =================
+
+def _intern_background(c, width, height):
+    # 1. Background
+    c.setFillColor(HexColor("#FFFFFF"))
+    c.rect(0, 0, width, height, fill=1)
+
+    # 2. Borders
+    c.setStrokeColor(HexColor("#4f46e5")) # Main Blue
+    c.setLineWidth(10)
+    c.rect(20, 20, width - 40, height - 40)
+
+    c.setStrokeColor(HexColor("#f59e0b")) # Amber
+    c.setLineWidth(2)
+    c.rect(35, 35, width - 70, height - 70)
+
+    # 3. Logo (Header)
+    logo = _image('analogica_logo.jpg')
+
+    # Center Logo (Analogica) - TOP
+    logo_y_top = height - 120
+    if logo:
+         c.drawImage(logo, width/2 - 30, logo_y_top, width=60, height=60, mask='auto', preserveAspectRatio=True)
+    else:
+        c.setFillColor(HexColor("#0f172a"))
+        c.circle(width/2, logo_y_top + 30, 30, fill=1)
+
+    # 4. Company Name
+    c.setFont("Helvetica-Bold", 30)
+    c.setFillColor(HexColor("#1e3a8a"))
+    c.drawCentredString(width / 2, height - 160, "ANALOGICA SKILL TRACK")
+
+    # 5. Title
+    c.setFont("Helvetica", 18)
+    c.setFillColor(HexColor("#64748b"))
+    c.drawCentredString(width / 2, height - 215, "CERTIFICATE OF ACHIEVEMENT")
+
+    # Divider
+    c.setStrokeColor(HexColor("#f59e0b"))
+    c.setLineWidth(2)
+    c.line(width/2 - 100, height - 230, width/2 + 100, height - 230)
+
+    # 13. Signatures & Footer Logos
+    footer_y = 100
+
+    # Left: Signature
+    c.setLineWidth(1)
+    c.setStrokeColor(HexColor("#000000"))
+    c.line(80, footer_y + 30, 230, footer_y + 30)
+
+    c.setFont("Helvetica-Bold", 12)
+    c.setFillColor(HexColor("#000000"))
+    c.drawString(80, footer_y + 10, "Director")
+    c.setFont("Helvetica", 10)
+    c.setFillColor(HexColor("#64748b"))
+    c.drawString(80, footer_y - 5, "Analogica SkillTrack")
+
+    # Right: Logos (AICTE & MSME)
+    aicte = _image('logos', 'aicte_logo.jpg')
+    msme = _image('logos', 'msme_logo.png')
+    logo_y_bottom = 70
+    start_x_logos = width - 200
+
+    if aicte:
+         c.drawImage(aicte, start_x_logos, logo_y_bottom, width=50, height=50, mask='auto', preserveAspectRatio=True)
+    if msme:
+         c.drawImage(msme, start_x_logos + 60, logo_y_bottom, width=80, height=50, mask='auto', preserveAspectRatio=True)
+
+
+def _intern_stamp(c, width, height, intern_name, internship_name, start_date, end_date, cert_id, issue_date):
+    # 6. Body Text (Professional Wrap)
+    text_y = height - 280
+    margin_x = 60
+    max_width = width - 120
+
+    def draw_wrapped_text(c, text, x, y, max_w, font, size, leading):
+        lines = simpleSplit(text, font, size, max_w)
+        curr_y = y
+        for line in lines:
+            c.setFont(font, size)
+            c.drawString(x, curr_y, line)
+            curr_y -= leading
+        return curr_y - 12
+
+    c.setFillColor(HexColor("#64748b")) # Slate, as the title
+    current_y = text_y
+
+    # Para 1
+    name = intern_name.upper()
+    intro = f"This is to certify that {name}, (Intern ID: {cert_id}), has successfully completed the {internship_name} with Analogica SkillTrack from {start_date} to {end_date}."
+    current_y = draw_wrapped_text(c, intro, margin_x, current_y, max_width, "Times-Roman", 12, 18)
+
+    # Para 2
+    feedback = "During this period, they have served as a dedicated intern and have displayed remarkable sincerity, and a strong desire to learn. They have exhibited exceptional coordination skills and effective communication abilities. Moreover, attention to detail has been truly impressive."
+    current_y = draw_wrapped_text(c, feedback, margin_x, current_y, max_width, "Times-Roman", 12, 18)
+
+    # Para 3
+    passion = f"They have consistently approached new assignments and challenges with enthusiasm, showcasing passion for {internship_name}. Their commitment and willingness to acquire new knowledge and skills have been evident throughout this internship."
+    current_y = draw_wrapped_text(c, passion, margin_x, current_y, max_width, "Times-Roman", 12, 18)
+
+    # Para 4
+    wishes = f"We extend our best wishes to {name} for a successful future, and we have no doubt that they will continue to excel in the field."
+    current_y = draw_wrapped_text(c, wishes, margin_x, current_y, max_width, "Times-Roman", 12, 18)
+
+    # Extra: Issue Date (Aligned right below text)
+    c.setFont("Helvetica-Bold", 12)
+    c.drawRightString(width - 60, current_y - 10, f"Date: {issue_date}")
+
+
+INTERN_TEMPLATE = CertificateTemplate("intern", 1, A4, _intern_background, _intern_stamp)
+
+
+# ================= RENDERING =================
+# Plain functions of their arguments so they can run in a worker process.
+
+def render_course_certificate(output_path, student_name, course_name, cert_id, issue_date):
+    COURSE_TEMPLATE.render(
+        output_path, student_name=student_name, course_name=course_name, cert_id=cert_id, issue_date=issue_date
+    )
+
+
+def render_intern_certificate(output_path, intern_name, internship_name, start_date, end_date, cert_id, issue_date):
+    INTERN_TEMPLATE.render(
+        output_path, intern_name=intern_name, internship_name=internship_name, start_date=start_date,
+        end_date=end_date, cert_id=cert_id, issue_date=issue_date
+    )
+
+
+# ================= JOBS =================
+# Job state is one small JSON file per job, shared by every worker on the host (the PDFs
+# themselves are local files too). Writes go through a temp file and os.replace, so a reader
+# never sees half a state.
+
+JOB_ID = re.compile(r"^[a-z]+-\d+-\d+-[0-9a-f]+$")
+ACTIVE = ("queued", "running")
+
+
+def _write_state(path, state):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def _read_state(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _run_job(state_path, render, args):
+    """Runs in the pool process: marks the job running, then renders"""
+    state = _read_state(state_path)
+    if state:
+        state.update(status="running", updated_at=time.time())
+        _write_state(state_path, state)
+    render(*args)
+
+
+class CertificateJobs:
+    """Renders certificates in a process pool so HTTP workers only queue them.
+
+    A job is keyed by (kind, user_id, target_id): while one is queued or running, a second request
+    for the same certificate, from any worker, gets that job back. Job state lives in
+    CERTIFICATE_JOB_DIR (the instance folder by default), so any worker can answer a status poll.
+    A job that has not finished within CERTIFICATE_JOB_TIMEOUT (its worker died, say) reports
+    failed and no longer blocks a new one. State files are removed after CERTIFICATE_JOB_RETENTION.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pool = None
+        self.app = None
+        self.job_dir = None
+
+    def init_app(self, app):
+        self.app = app
+        self.job_dir = app.config.get("CERTIFICATE_JOB_DIR") or os.path.join(app.instance_path, "certificate_jobs")
+        os.makedirs(self.job_dir, exist_ok=True)
+        atexit.register(self.shutdown)
+
+    def _config(self, name):
+        return self.app.config.get(name, getattr(Config, name))
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self._config("CERTIFICATE_WORKERS"))
+        return self._pool
+
+    def _path(self, name):
+        return os.path.join(self.job_dir, name)
+
+    def submit(self, kind, user_id, target_id, url, render, args, on_done=None):
+        """Queues render(*args) unless the same certificate is already in flight; returns the job"""
+        key = f"{kind}-{int(user_id)}-{int(target_id)}"
+        job_id = f"{key}-{uuid.uuid4().hex[:8]}"
+        now = time.time()
+        job = {"id": job_id, "key": key, "user_id": int(user_id), "url": url, "status": "queued",
+               "error": None, "created_at": now, "updated_at": now}
+        state_path = self._path(f"{job_id}.json")
+
+        with self._lock:
+            self._prune()
+            _write_state(state_path, job)
+            holder = self._claim(key, job_id)
+            if holder != job_id:
+                os.remove(state_path)
+                return self.get(holder) or job
+            future = self._executor().submit(_run_job, state_path, render, args)
+        future.add_done_callback(lambda future: self._finish(job_id, key, future, on_done))
+        return job
+
+    def _claim(self, key, job_id):
+        """Makes job_id the in-flight job for key unless a live one holds it; returns the holder's id"""
+        claim = self._path(f"{key}.active")
+        tmp = self._path(f"{job_id}.claim")
+        with open(tmp, "w") as f:
+            f.write(job_id)
+        holder = job_id
+        try:
+            for _ in range(2):
+                try:
+                    os.link(tmp, claim)  # Atomic: fails if any worker holds the key
+                    return job_id
+                except FileExistsError:
+                    try:
+                        with open(claim) as f:
+                            holder = f.read()
+                    except OSError:
+                        continue
+                    job = self.get(holder)
+                    if job and job["status"] in ACTIVE:
+                        return holder
+                    # Finished, timed out or lost: take the key over
+                    self._release(key, holder)
+            return holder
+        finally:
+            os.remove(tmp)
+
+    def _release(self, key, job_id):
+        claim = self._path(f"{key}.active")
+        try:
+            with open(claim) as f:
+                if f.read() == job_id:
+                    os.remove(claim)
+        except OSError:
+            pass
+
+    def _finish(self, job_id, key, future, on_done):
+        if future.cancelled():
+            error = RuntimeError("Certificate generation was cancelled")
+        else:
+            error = future.exception()
+        if error is None and on_done:
+            # Callback thread: no request context, so give on_done an app context of its own
+            with self.app.app_context():
+                try:
+                    on_done()
+                except Exception as e:
+                    db.session.rollback()
+                    error = e
+        if error is not None:
+            print(f"❌ Certificate Generation Error ({job_id}): {error}")
+            try:
+                with open("certificate_error.log", "w") as f:
+                    f.write(f"Job {job_id}\n")
+                    f.write("".join(traceback.format_exception(error)))
+            except Exception:
+                pass
+
+        # "done" only once the result is recorded, not merely when the PDF is written
+        state_path = self._path(f"{job_id}.json")
+        state = _read_state(state_path)
+        if state:
+            state.update(status="failed" if error else "done", error=str(error) if error else None,
+                         updated_at=time.time())
+            _write_state(state_path, state)
+        self._release(key, job_id)
+
+    def get(self, job_id):
+        """State of a job queued by any worker, None when unknown or expired"""
+        if not JOB_ID.match(job_id or ""):
+            return None
+        job = _read_state(self._path(f"{job_id}.json"))
+        if job and job["status"] in ACTIVE and time.time() - job["created_at"] > self._config("CERTIFICATE_JOB_TIMEOUT"):
+            job.update(status="failed", error="Certificate generation timed out, please try again")
+        return job
+
+    def _prune(self):
+        cutoff = time.time() - self._config("CERTIFICATE_JOB_RETENTION")
+        for entry in os.scandir(self.job_dir):
+            if entry.name.endswith(".json"):
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def payload(job):
+        return {
+            "job_id": job["id"],
+            "status": job["status"],
+            "url": job["url"] if job["status"] == "done" else None,
+            "error": job["error"]
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+certificate_jobs = CertificateJobs()
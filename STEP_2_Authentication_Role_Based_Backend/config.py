@@ -22,5 +22,30 @@ class Config:
     MAIL_PASSWORD = "ezua hvii pjox qiwu"
     MAIL_DEFAULT_SENDER = MAIL_USERNAME
 
+    # ================= CACHING =================
+    DASHBOARD_CACHE_SIZE = 1024   # Students kept in memory per worker (LRU)
+    DASHBOARD_CACHE_TTL = 300     # Seconds before a cached dashboard is rebuilt
+    TRAINER_DASHBOARD_CACHE_SIZE = 256
+    QUIZ_STATS_CACHE_SIZE = 256
+    QUIZ_STATS_CACHE_TTL = 3600   # New attempts are folded in on read; this only bounds deletions
+    NAME_CACHE_SIZE = 4096        # Trainer / internship display names
+    NAME_CACHE_TTL = 600
+    ADMIN_STATS_CACHE_TTL = 30    # Platform totals on the admin dashboard
+    CATALOG_CACHE_TTL = 60        # Public /courses, /workshops, /internships bodies
+
+    # ================= BULK WRITES =================
+    FANOUT_BATCH_SIZE = 1000      # Rows per multi-row INSERT / UPDATE when fanning out to a cohort
+    CASCADE_DELETE_THRESHOLD = 20000  # Larger user / course / internship deletes are purged in the background
+    CASCADE_DELETE_CHUNK = 1000   # Rows per DELETE (and per commit) during a background purge
+
+    # ================= CERTIFICATES =================
+    CERTIFICATE_WORKERS = 2       # Processes rendering PDFs, shared by every request of this worker
+    CERTIFICATE_JOB_DIR = None    # Job state shared by the workers; None = <instance folder>/certificate_jobs
+    CERTIFICATE_JOB_TIMEOUT = 300  # Seconds before an unfinished job reports failed and can be retried
+    CERTIFICATE_JOB_RETENTION = 86400  # Seconds a finished job stays visible to the status endpoint
+
+    # ================= ACTIVITY / STREAKS =================
+    ACTIVITY_FLUSH_INTERVAL = 30  # Seconds between batched streak UPDATEs
+
     # ================= FRONTEND =================
     FRONTEND_URL = "https://darshan-simpi.github.io/Analogica-SkillTrack---LMS"
@@ -1,28 +1,54 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 from datetime import datetime, timedelta
+import os
+import uuid
+from sqlalchemy import func
+from sqlalchemy.orm import contains_eager
 from extensions import db
-from models import Course, Workshop, Internship, User, Task, Submission, Enrollment, StudentProgress, TaskSubmission, CourseResource
+from models import Course, Workshop, Internship, User, Task, TaskTemplate, Assignment, Submission, Enrollment, StudentProgress, TaskSubmission
 
 from utils import allowed_file, get_required_assignments, parse_duration_to_days
+from progress import record_course_item, record_completion
+from activity import activity_recorder, projected_streak
+from trainers import apply_trainer
+from stats import platform_stats, platform_stats_cache, adjust_platform_stats
+from catalog import Catalog
+from tasks import create_template, assign_template, backfill_enrollee
+from cascade import cascade_delete, course_plan, internship_plan
+from grades import forget_grades
+from quiz_analytics import quiz_stats_cache
+from certificates import certificate_jobs, render_intern_certificate, CERTIFICATE_DIR
+from cache import (
+    dashboard_cache, trainer_dashboard_cache, invalidate_students, invalidate_course, invalidate_internship,
+    invalidate_trainer_internship, cached_names, forget_name
+)
 
 course_bp = Blueprint("course_api", __name__)
 
 # ================= COURSES =================
 
-@course_bp.route("/courses", methods=["GET"])
-def get_courses():
-    courses = Course.query.all()
-    return jsonify([
+def _course_list():
+    return [
         {
             "id": c.id,
             "name": c.name,
             "date": c.start_date,
             "mentor_name": c.mentor_name,
+            "trainer_id": c.trainer_id,
             "duration": c.duration
         }
-        for c in courses
-    ]), 200
+        for c in Course.query.all()
+    ]
+
+
+# ✅ Public catalog reads are served from memory with ETag / 304 (see catalog.py)
+course_catalog = Catalog("courses", _course_list)
+
+
+@course_bp.route("/courses", methods=["GET"])
+def get_courses():
+    return course_catalog.response()
 
 
 @course_bp.route("/courses", methods=["POST"])
@@ -40,9 +66,14 @@ def add_course():
         mentor_name=data.get("mentor_name"),  # ✅
         duration=data.get("duration")         # ✅
     )
+    if not apply_trainer(course, data):
+        return jsonify({"error": "Trainer not found"}), 400
 
     db.session.add(course)
     db.session.commit()
+    trainer_dashboard_cache.clear()
+    adjust_platform_stats("courses")
+    course_catalog.bump()
     return jsonify({"message": "Course added"}), 201
 
 
@@ -53,24 +84,25 @@ def delete_course(id):
     if claims.get("role") != "ADMIN":
         return jsonify({"error": "Admin access required"}), 403
 
-    course = Course.query.get_or_404(id)
+    Course.query.get_or_404(id)
 
-    # ✅ MANUAL CASCADE DELETE
-    # 1. Enrollments
-    Enrollment.query.filter_by(course_id=id).delete()
-    
-    # 2. Student Progress
-    StudentProgress.query.filter_by(course_id=id).delete()
-    
-    # 3. Certificates
-    # Certificate.query.filter_by(course_id=id).delete() 
-    
-    # 6. Resources
-    CourseResource.query.filter_by(course_id=id).delete()
+    invalidate_course(id)
+    trainer_dashboard_cache.clear()
 
-    db.session.delete(course)
-    db.session.commit()
-    return jsonify({"message": "Course and all related data deleted"}), 200
+    # ✅ CASCADE DELETE: tasks, assignments, quizzes, certificates, resources, progress, enrollments
+    def prepare():
+        # Graded assignment submissions leave their students' running averages
+        forget_grades(Submission.assignment_id.in_(db.session.query(Assignment.id).filter_by(course_id=id)))
+
+    def after():
+        quiz_stats_cache.clear()
+        platform_stats_cache.clear()  # The cascade also removed enrollments, so recount everything
+        course_catalog.bump()
+
+    deleted = cascade_delete(course_plan(id), prepare, after)
+    if deleted is None:
+        return jsonify({"message": "Course is being deleted in the background"}), 202
+    return jsonify({"message": "Course and all related data deleted", "deleted": deleted}), 200
 
 
 @course_bp.route("/courses/<int:id>", methods=["PUT"])
@@ -85,19 +117,21 @@ def edit_course(id):
 
     course.name = data.get("name", course.name)
     course.start_date = data.get("date", course.start_date)
-    course.mentor_name = data.get("mentor_name", course.mentor_name)
     course.duration = data.get("duration", course.duration)
+    if not apply_trainer(course, data):
+        return jsonify({"error": "Trainer not found"}), 400
 
     db.session.commit()
+    invalidate_course(course.id)
+    trainer_dashboard_cache.clear()
+    course_catalog.bump()
     return jsonify({"message": "Course updated"}), 200
 
 
 # ================= WORKSHOPS =================
 
-@course_bp.route("/workshops", methods=["GET"])
-def get_workshops():
-    workshops = Workshop.query.all()
-    return jsonify([
+def _workshop_list():
+    return [
         {
             "id": w.id,
             "title": w.title,
@@ -106,8 +140,16 @@ def get_workshops():
             "start_date": w.start_date,
             "end_date": w.end_date
         }
-        for w in workshops
-    ]), 200
+        for w in Workshop.query.all()
+    ]
+
+
+workshop_catalog = Catalog("workshops", _workshop_list)
+
+
+@course_bp.route("/workshops", methods=["GET"])
+def get_workshops():
+    return workshop_catalog.response()
 
 
 @course_bp.route("/workshops", methods=["POST"])
@@ -127,6 +169,7 @@ def add_workshop():
     )
     db.session.add(workshop)
     db.session.commit()
+    workshop_catalog.bump()
     return jsonify({"message": "Workshop added"}), 201
 
 
@@ -140,6 +183,7 @@ def delete_workshop(id):
     workshop = Workshop.query.get_or_404(id)
     db.session.delete(workshop)
     db.session.commit()
+    workshop_catalog.bump()
     return jsonify({"message": "Workshop deleted"}), 200
 
 
@@ -160,23 +204,31 @@ def edit_workshop(id):
     workshop.end_date = data.get("end_date", workshop.end_date)
 
     db.session.commit()
+    workshop_catalog.bump()
     return jsonify({"message": "Workshop updated"}), 200
 
 
 # ================= INTERNSHIPS =================
 
-@course_bp.route("/internships", methods=["GET"])
-def get_internships():
-    internships = Internship.query.all()
-    return jsonify([
+def _internship_list():
+    return [
         {
             "id": i.id,
             "intern_name": i.intern_name,
             "mentor_name": i.mentor_name,
+            "trainer_id": i.trainer_id,
             "duration": i.duration
         }
-        for i in internships
-    ]), 200
+        for i in Internship.query.all()
+    ]
+
+
+internship_catalog = Catalog("internships", _internship_list)
+
+
+@course_bp.route("/internships", methods=["GET"])
+def get_internships():
+    return internship_catalog.response()
 
 
 @course_bp.route("/internships", methods=["POST"])
@@ -192,8 +244,13 @@ def add_internship():
         mentor_name=data.get("mentor_name"),
         duration=data.get("duration")
     )
+    if not apply_trainer(internship, data):
+        return jsonify({"error": "Trainer not found"}), 400
     db.session.add(internship)
     db.session.commit()
+    trainer_dashboard_cache.clear()
+    adjust_platform_stats("internships")
+    internship_catalog.bump()
     return jsonify({"message": "Internship added"}), 201
 
 
@@ -204,19 +261,21 @@ def delete_internship(id):
     if claims.get("role") != "ADMIN":
         return jsonify({"error": "Admin access required"}), 403
 
-    internship = Internship.query.get_or_404(id)
+    Internship.query.get_or_404(id)
     
-    # ✅ MANUAL CASCADE DELETE
-    Enrollment.query.filter_by(internship_id=id).delete()
-    
-    tasks = Task.query.filter_by(internship_id=id).all()
-    for t in tasks:
-        TaskSubmission.query.filter_by(task_id=t.id).delete()
-        db.session.delete(t)
-        
-    db.session.delete(internship)
-    db.session.commit()
-    return jsonify({"message": "Internship and all related data deleted"}), 200
+    invalidate_internship(id)
+    trainer_dashboard_cache.clear()
+
+    # ✅ CASCADE DELETE: task submissions, tasks, resources, enrollments
+    def after():
+        forget_name("internships", id)
+        platform_stats_cache.clear()
+        internship_catalog.bump()
+
+    deleted = cascade_delete(internship_plan(id), after=after)
+    if deleted is None:
+        return jsonify({"message": "Internship is being deleted in the background"}), 202
+    return jsonify({"message": "Internship and all related data deleted", "deleted": deleted}), 200
 
 
 @course_bp.route("/internships/<int:id>", methods=["PUT"])
@@ -230,10 +289,15 @@ def edit_internship(id):
     data = request.get_json()
 
     internship.intern_name = data.get("intern_name", internship.intern_name)
-    internship.mentor_name = data.get("mentor_name", internship.mentor_name)
     internship.duration = data.get("duration", internship.duration)
+    if not apply_trainer(internship, data):
+        return jsonify({"error": "Trainer not found"}), 400
 
     db.session.commit()
+    invalidate_internship(internship.id)
+    forget_name("internships", internship.id)
+    internship_catalog.bump()
+    trainer_dashboard_cache.clear()
     return jsonify({"message": "Internship updated"}), 200
 
 
@@ -246,11 +310,22 @@ def admin_stats():
     if claims.get("role") != "ADMIN":
         return jsonify({"error": "Admin access required"}), 403
 
+    # students / trainers / interns / admins, courses, internships, enrollments, submissions,
+    # task_submissions and certificates from one UNION ALL query, cached for a few seconds
+    return jsonify(platform_stats()), 200
+
+@course_bp.route("/admin/cache/stats", methods=["GET"])
+@jwt_required()
+def cache_stats():
+    claims = get_jwt()
+    if claims.get("role") != "ADMIN":
+        return jsonify({"error": "Admin access required"}), 403
+
+    # Hit / miss counters of this worker's caches, used to size them
     return jsonify({
-        "students": User.query.filter_by(role="STUDENT").count(),
-        "trainers": User.query.filter_by(role="TRAINER").count(),
-        "interns": User.query.filter_by(role="INTERN").count(),
-        "courses": Course.query.count()
+        "student_dashboard": dashboard_cache.stats(),
+        "trainer_dashboard": trainer_dashboard_cache.stats(),
+        "platform_stats": platform_stats_cache.stats()
     }), 200
 
 @course_bp.route("/interns", methods=["GET"])
@@ -274,11 +349,24 @@ def get_tasks():
     role = claims.get("role")
 
     if role == "INTERN" or role == "STUDENT":
+        # Latest submission of each task, outer joined so one query returns every task with its grade
+        latest = db.session.query(TaskSubmission.task_id, func.max(TaskSubmission.id).label("submission_id")) \
+            .filter(TaskSubmission.student_id == user_id) \
+            .group_by(TaskSubmission.task_id).subquery()
+
         # Order by internship first to grouping works for unlocking logic
-        raw_tasks = Task.query.filter_by(assigned_to=user_id).order_by(Task.internship_id, Task.week_number, Task.id).all()
+        rows = db.session.query(Task, TaskSubmission.grade, TaskSubmission.feedback) \
+            .join(Task.template).options(contains_eager(Task.template)) \
+            .outerjoin(latest, latest.c.task_id == Task.id) \
+            .outerjoin(TaskSubmission, TaskSubmission.id == latest.c.submission_id) \
+            .filter(Task.assigned_to == user_id) \
+            .order_by(Task.internship_id, TaskTemplate.week_number, Task.id).all()
+        raw_tasks = [t for t, _, _ in rows]
+        trainer_names = cached_names(User.name, [t.assigned_by for t in raw_tasks])
+        internship_names = cached_names(Internship.intern_name, [t.internship_id for t in raw_tasks])
         tasks = []
         
-        for index, t in enumerate(raw_tasks):
+        for index, (t, grade, feedback) in enumerate(rows):
             week_num = t.week_number # Trust the week number
             is_unlocked = True
             
@@ -298,9 +386,6 @@ def get_tasks():
                 is_unlocked = prev_deadline_passed
 
             is_submitted = (t.status == 'Completed')
-            submission = TaskSubmission.query.filter_by(task_id=t.id, student_id=user_id).first()
-            grade = submission.grade if submission else None
-            feedback = submission.feedback if submission else None
 
             tasks.append({
                 "id": t.id,
@@ -313,10 +398,10 @@ def get_tasks():
                 "is_unlocked": is_unlocked,
                 "is_submitted": is_submitted,
                 "display_week": f"Week {week_num}",
-                "assigned_by": User.query.get(t.assigned_by).name if t.assigned_by else None,
+                "assigned_by": trainer_names.get(t.assigned_by),
                 "grade": grade,
                 "feedback": feedback,
-                "internship_name": Internship.query.get(t.internship_id).intern_name if t.internship_id else "General Tasks",
+                "internship_name": internship_names.get(t.internship_id) if t.internship_id else "General Tasks",
                 "internship_id": t.internship_id
             })
 
@@ -324,6 +409,7 @@ def get_tasks():
 
     elif role == "TRAINER":
         tasks = Task.query.filter_by(assigned_by=user_id).all()
+        trainer_names = cached_names(User.name, [t.assigned_by for t in tasks])
         return jsonify([
             {
                 "id": t.id,
@@ -332,7 +418,7 @@ def get_tasks():
                 "status": t.status,
                 "priority": t.priority,
                 "due_date": t.due_date,
-                "assigned_by": User.query.get(t.assigned_by).name if t.assigned_by else None
+                "assigned_by": trainer_names.get(t.assigned_by)
             }
             for t in tasks
         ]), 200
@@ -370,51 +456,35 @@ def assign_task():
     data = request.get_json()
     trainer_id = int(get_jwt_identity())
     
-    tasks_to_create = []
+    assignees = []
     
     if data.get("course_id"):
-        students = StudentProgress.query.filter_by(course_id=data["course_id"]).all()
-        for s in students:
-            tasks_to_create.append(Task(
-                title=data.get("title"),
-                description=data.get("description"),
-                assigned_to=s.user_id,
-                assigned_by=trainer_id,
-                priority=data.get("priority", "Medium"),
-                due_date=data.get("due_date"),
-                course_id=data.get("course_id") # ✅ Saved
-            ))
-            
+        assignees = [sid for (sid,) in db.session.query(StudentProgress.user_id).filter_by(course_id=data["course_id"])]
     elif data.get("internship_id"):
-        enrollments = Enrollment.query.filter_by(internship_id=data["internship_id"]).all()
-        for e in enrollments:
-            tasks_to_create.append(Task(
-                title=data.get("title"),
-                description=data.get("description"),
-                assigned_to=e.user_id,
-                assigned_by=trainer_id,
-                priority=data.get("priority", "Medium"),
-                due_date=data.get("due_date"),
-                internship_id=data["internship_id"]
-            ))
-            
+        assignees = [uid for (uid,) in db.session.query(Enrollment.user_id).filter_by(internship_id=data["internship_id"])]
     elif data.get("assigned_to"):
-        tasks_to_create.append(Task(
-            title=data.get("title"),
-            description=data.get("description"),
-            assigned_to=data.get("assigned_to"),
-            assigned_by=trainer_id,
-            priority=data.get("priority", "Medium"),
-            due_date=data.get("due_date"),
-            internship_id=data.get("internship_id")
-        ))
+        assignees = [data.get("assigned_to")]
     
-    if not tasks_to_create:
+    if not assignees:
         return jsonify({"error": "No valid targets found for assignment"}), 400
 
-    db.session.add_all(tasks_to_create)
+    template = create_template(
+        title=data.get("title"),
+        description=data.get("description"),
+        assigned_by=trainer_id,
+        priority=data.get("priority", "Medium"),
+        due_date=data.get("due_date"),
+        course_id=data.get("course_id"), # ✅ Saved
+        internship_id=data.get("internship_id")
+    )
+    count = assign_template(template, assignees)
+
+    if data.get("course_id"):
+        record_course_item(data["course_id"], "task", student_ids=assignees)
+
     db.session.commit()
-    return jsonify({"message": f"Task assigned to {len(tasks_to_create)} users"}), 201
+    invalidate_students(*assignees)
+    return jsonify({"message": f"Task assigned to {count} users"}), 201
 
 
 @course_bp.route("/tasks/<int:id>", methods=["PUT"])
@@ -434,8 +504,9 @@ def update_task(id):
     if "status" in data:
         task.status = data["status"]
     if "description" in data and role == "TRAINER":
-        task.description = data["description"]
+        task.template.description = data["description"]  # Shared by every assignee of this task
     db.session.commit()
+    invalidate_students(task.assigned_to)
     return jsonify({"message": "Task updated"}), 200
 
 
@@ -536,37 +607,13 @@ def enroll_internship():
     enrollment = Enrollment(user_id=user_id, internship_id=internship_id)
     db.session.add(enrollment)
     
-    # Backfill logic simplified
-    existing_tasks = Task.query.filter_by(internship_id=internship_id).all()
-    
-    # Logic to populate tasks if they exist for the internship template (via other users or trainers)
-    # Ideally should copy from a TemplateTask table, but here acts as copy from peers
-    if not existing_tasks:
-        peer_enrollments = Enrollment.query.filter_by(internship_id=internship_id).all()
-        peer_ids = [e.user_id for e in peer_enrollments if e.user_id != user_id]
-        if peer_ids:
-            # Get tasks assigned to peers for this internship
-            peer_tasks = Task.query.filter(Task.assigned_to.in_(peer_ids), Task.internship_id == internship_id).all()
-            existing_tasks.extend(peer_tasks)
-
-    unique_tasks = {t.title: t for t in existing_tasks} 
-    for _, t in unique_tasks.items():
-        user_has_task = Task.query.filter_by(assigned_to=user_id, title=t.title).first()
-        if not user_has_task:
-            new_task = Task(
-                title=t.title,
-                description=t.description,
-                assigned_to=user_id,
-                assigned_by=t.assigned_by,
-                internship_id=internship_id,
-                priority=t.priority,
-                due_date=t.due_date,
-                status="Pending",
-                week_number=t.week_number
-            )
-            db.session.add(new_task)
+    # Backfill: a copy of every task template of the internship the user does not have yet
+    backfill_enrollee(user_id, internship_id=internship_id)
 
     db.session.commit()
+    invalidate_students(user_id)
+    invalidate_trainer_internship(internship_id)
+    adjust_platform_stats("enrollments")
     return jsonify({"message": "Enrolled successfully"}), 201
 
 
@@ -582,10 +629,8 @@ def get_mentors():
         progress = StudentProgress.query.filter_by(user_id=user_id).all()
         course_ids.update({p.course_id for p in progress})
         if course_ids:
-            courses = Course.query.filter(Course.id.in_(course_ids)).all()
-            mentor_names = [c.mentor_name for c in courses if c.mentor_name]
-            if mentor_names:
-                trainers = User.query.filter(User.name.in_(mentor_names), User.role == "TRAINER").all()
+            trainer_ids = db.session.query(Course.trainer_id).filter(Course.id.in_(course_ids), Course.trainer_id.isnot(None))
+            trainers = User.query.filter(User.id.in_(trainer_ids), User.role == "TRAINER").all()
 
     if not trainers:
         trainers = User.query.filter_by(role="TRAINER").all()
@@ -608,21 +653,10 @@ def get_intern_stats():
     user_id = int(get_jwt_identity())
     user = User.query.get(user_id)
     
-    # ✅ STREAK UPDATE LOGIC (Same as Student Dashboard)
-    today = datetime.utcnow().date()
-    yesterday = today - timedelta(days=1)
-    
-    # If no activity recorded yet, or last activity was NOT today
-    if user.last_activity_date != today:
-        if user.last_activity_date == yesterday:
-            user.current_streak = (user.current_streak or 0) + 1
-        else:
-            # Broken streak (unless it's the very first time, handled by 0 default)
-            # If last activity was older than yesterday, reset to 1
-            user.current_streak = 1
-        
-        user.last_activity_date = today
-        db.session.commit()
+    # ✅ STREAK UPDATE LOGIC (Same as Student Dashboard: buffered, no write on this GET)
+    activity_recorder.record(user_id)
+    current_streak = projected_streak(user)
+
     # Calculate Total Tasks (Assigned across all internships)
     tasks = Task.query.filter_by(assigned_to=user_id).all()
     total_assigned_tasks = len(tasks)
@@ -665,7 +699,7 @@ def get_intern_stats():
         "overall_progress": overall_progress,
         "internships_enrolled": enrolled_count,
         "tasks_done_today": tasks_done_today,
-        "current_streak": user.current_streak if user.current_streak else 0,
+        "current_streak": current_streak,
         "mentor_name": mentor_name
     }), 200
 
@@ -707,185 +741,57 @@ def generate_intern_certificate():
     if len(completed) < required_count:
         return jsonify({"error": f"Complete all {required_count} tasks first"}), 400
         
-    try:
-        from reportlab.lib.pagesizes import A4
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.units import inch
-        from reportlab.lib.colors import HexColor
-        from reportlab.lib.utils import simpleSplit # Added for wrapping
-        import os
-        import uuid
-        
-        cert_dir = os.path.join(os.getcwd(), 'static', 'certificates')
-        os.makedirs(cert_dir, exist_ok=True)
-        
-        filename = f"Intern_Certificate_{user_id}_{enrollment.internship_id}.pdf"
-        filepath = os.path.join(cert_dir, filename)
-        
-        # Setup Canvas (Portrait A4)
-        width, height = A4
-        c = canvas.Canvas(filepath, pagesize=A4)
-        
-        # Fetch Details
-        internship_name = "Internship Program"
-        start_date = "December 2024"
-        end_date = "January 2025"
-        
-        mentor_name = "Mentor"
-        
-        if enrollment:
-            if enrollment.internship_id:
-                i = Internship.query.get(enrollment.internship_id)
-                if i: 
-                   name = i.intern_name.strip()
-                   internship_name = f"{name} Internship" if not name.lower().endswith("internship") else name
-                   mentor_name = i.mentor_name
-                   
-                   # Dynamically calculate duration based on internship setting
-                   from datetime import timedelta
-                   end_dt = datetime.utcnow()
-                   
-                   # Use utility to get days from duration string (e.g., "2 weeks" -> 14)
-                   duration_days = parse_duration_to_days(i.duration)
-                   start_dt = end_dt - timedelta(days=duration_days) 
-                   
-                   # Precise dates for certificate
-                   start_date = start_dt.strftime("%B %d, %Y")
-                   end_date = end_dt.strftime("%B %d, %Y")
-
-        issue_date = datetime.utcnow().strftime("%B %d, %Y")
-        short_uuid = str(uuid.uuid4())[:8].upper()
-        # Clean ID
-        cert_id = f"ANLG/INT/{user_id}/{short_uuid}"
-
-        # ================= DESIGN (Portrait Professional) =================
-        
-        # 1. Background
-        c.setFillColor(HexColor("#FFFFFF"))
-        c.rect(0, 0, width, height, fill=1)
-        
-        # 2. Borders
-        c.setStrokeColor(HexColor("#4f46e5")) # Main Blue
-        c.setLineWidth(10)
-        c.rect(20, 20, width - 40, height - 40)
-        
-        c.setStrokeColor(HexColor("#f59e0b")) # Amber
-        c.setLineWidth(2)
-        c.rect(35, 35, width - 70, height - 70)
-
-        # 3. Logo (Header)
-        logo_dir = os.path.join(os.getcwd(), 'static', 'logos')
-        analogica_path = os.path.join(os.getcwd(), 'static', 'analogica_logo.jpg')
-        
-        # Center Logo (Analogica) - TOP
-        logo_y_top = height - 120
-        if os.path.exists(analogica_path):
-             c.drawImage(analogica_path, width/2 - 30, logo_y_top, width=60, height=60, mask='auto', preserveAspectRatio=True)
-        else:
-            c.setFillColor(HexColor("#0f172a"))
-            c.circle(width/2, logo_y_top + 30, 30, fill=1)
-
-        # 4. Company Name
-        c.setFont("Helvetica-Bold", 30)
-        c.setFillColor(HexColor("#1e3a8a"))
-        c.drawCentredString(width / 2, height - 160, "ANALOGICA SKILL TRACK")
-        
-        # 5. Title
-        c.setFont("Helvetica", 18)
-        c.setFillColor(HexColor("#64748b"))
-        c.drawCentredString(width / 2, height - 215, "CERTIFICATE OF ACHIEVEMENT")
-        
-        # Divider
-        c.setStrokeColor(HexColor("#f59e0b"))
-        c.setLineWidth(2)
-        c.line(width/2 - 100, height - 230, width/2 + 100, height - 230)
-
-        # 6. Body Text (Professional Wrap)
-        text_y = height - 280
-        margin_x = 60
-        max_width = width - 120
-        
-        def draw_wrapped_text(c, text, x, y, max_w, font, size, leading):
-            lines = simpleSplit(text, font, size, max_w)
-            curr_y = y
-            for line in lines:
-                c.setFont(font, size)
-                c.drawString(x, curr_y, line)
-                curr_y -= leading
-            return curr_y - 12
-
-        current_y = text_y
-        
-        # Para 1
-        name = user.name.upper()
-        # Adjusted text: Removed "currently pursuing their degree" assumption and improved flow.
-        intro = f"This is to certify that {name}, (Intern ID: {cert_id}), has successfully completed the {internship_name} with Analogica SkillTrack from {start_date} to {end_date}."
-        current_y = draw_wrapped_text(c, intro, margin_x, current_y, max_width, "Times-Roman", 12, 18)
-        
-        # Para 2
-        feedback = "During this period, they have served as a dedicated intern and have displayed remarkable sincerity, and a strong desire to learn. They have exhibited exceptional coordination skills and effective communication abilities. Moreover, attention to detail has been truly impressive."
-        current_y = draw_wrapped_text(c, feedback, margin_x, current_y, max_width, "Times-Roman", 12, 18)
-
-        # Para 3
-        passion = f"They have consistently approached new assignments and challenges with enthusiasm, showcasing passion for {internship_name}. Their commitment and willingness to acquire new knowledge and skills have been evident throughout this internship."
-        current_y = draw_wrapped_text(c, passion, margin_x, current_y, max_width, "Times-Roman", 12, 18)
-        
-        # Para 4
-        wishes = f"We extend our best wishes to {name} for a successful future, and we have no doubt that they will continue to excel in the field."
-        current_y = draw_wrapped_text(c, wishes, margin_x, current_y, max_width, "Times-Roman", 12, 18)
-
-        # Extra: Issue Date (Aligned right below text)
-        c.setFont("Helvetica-Bold", 12)
-        c.drawRightString(width - 60, current_y - 10, f"Date: {issue_date}")
-
-
-        # 12. Bottom Badge (Removed)
-        # c.setStrokeColor(HexColor("#d97706")) 
-        # c.setLineWidth(2)
-        # c.circle(width/2, height - 600, 35, stroke=1, fill=0)
-        # c.setFont("Helvetica-Bold", 10)
-        # c.setFillColor(HexColor("#d97706"))
-        # c.drawCentredString(width/2, height - 600 - 4, "VERIFIED")
+    os.makedirs(CERTIFICATE_DIR, exist_ok=True)
+    
+    filename = f"Intern_Certificate_{user_id}_{enrollment.internship_id}.pdf"
+    filepath = os.path.join(CERTIFICATE_DIR, filename)
+    
+    # Fetch Details
+    internship_name = "Internship Program"
+    start_date = "December 2024"
+    end_date = "January 2025"
+    
+    if enrollment.internship_id:
+        i = Internship.query.get(enrollment.internship_id)
+        if i: 
+           name = i.intern_name.strip()
+           internship_name = f"{name} Internship" if not name.lower().endswith("internship") else name
+           
+           # Dynamically calculate duration based on internship setting
+           end_dt = datetime.utcnow()
+           
+           # Use utility to get days from duration string (e.g., "2 weeks" -> 14)
+           duration_days = parse_duration_to_days(i.duration)
+           start_dt = end_dt - timedelta(days=duration_days) 
+           
+           # Precise dates for certificate
+           start_date = start_dt.strftime("%B %d, %Y")
+           end_date = end_dt.strftime("%B %d, %Y")
+
+    issue_date = datetime.utcnow().strftime("%B %d, %Y")
+    short_uuid = str(uuid.uuid4())[:8].upper()
+    # Clean ID
+    cert_id = f"ANLG/INT/{user_id}/{short_uuid}"
+
+    # Rendering happens in the certificate process pool; poll /certificate/jobs/<job_id> for the URL
+    job = certificate_jobs.submit(
+        "intern", user_id, enrollment.internship_id or 0, f"/static/certificates/{filename}",
+        render_intern_certificate, (filepath, user.name, internship_name, start_date, end_date, cert_id, issue_date)
+    )
+    return jsonify(certificate_jobs.payload(job)), 202
 
-        # 13. Signatures & Footer Logos
-        footer_y = 100
-        
-        # Left: Signature
-        c.setLineWidth(1)
-        c.setStrokeColor(HexColor("#000000"))
-        c.line(80, footer_y + 30, 230, footer_y + 30)
-        
-        c.setFont("Helvetica-Bold", 12)
-        c.setFillColor(HexColor("#000000"))
-        c.drawString(80, footer_y + 10, "Director")
-        c.setFont("Helvetica", 10)
-        c.setFillColor(HexColor("#64748b"))
-        c.drawString(80, footer_y - 5, "Analogica SkillTrack")
-        
-        # Right: Logos (AICTE & MSME)
-        aicte_path = os.path.join(logo_dir, 'aicte_logo.jpg')
-        msme_path = os.path.join(logo_dir, 'msme_logo.png')
-        logo_y_bottom = 70 
-        logo_w = 50
-        gap = 20
-        start_x_logos = width - 200
-        
-        if os.path.exists(aicte_path):
-             c.drawImage(aicte_path, start_x_logos, logo_y_bottom, width=50, height=50, mask='auto', preserveAspectRatio=True)
-        if os.path.exists(msme_path):
-             c.drawImage(msme_path, start_x_logos + 60, logo_y_bottom, width=80, height=50, mask='auto', preserveAspectRatio=True)
 
-        c.save()
-        return jsonify({"message": "Certificate generated", "url": f"/static/certificates/{filename}"}), 201
-        
-    except Exception as e:
-        import traceback
-        error_msg = traceback.format_exc()
-        try:
-             with open("certificate_error.log", "w") as f:
-                 f.write(error_msg)
-        except: pass
-        return jsonify({"error": "PDF Generation Failed. Check server logs."}), 500
+@course_bp.route("/certificate/jobs/<job_id>", methods=["GET"])
+@jwt_required()
+def certificate_job_status(job_id):
+    """queued / running / done / failed for a certificate job queued by any worker, with the PDF url once done"""
+    user_id = int(get_jwt_identity())
+    job = certificate_jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    if job["user_id"] != user_id:
+        return jsonify({"error": "Unauthorized"}), 403
+    return jsonify(certificate_jobs.payload(job)), 200
 
 @course_bp.route("/intern/task/<int:task_id>/complete", methods=["POST"])
 @jwt_required()
@@ -929,9 +835,14 @@ def complete_intern_task(task_id):
     if not existing_sub:
         new_sub = TaskSubmission(task_id=task.id, student_id=user_id, file_path=file_path, submitted_at=datetime.utcnow())
         db.session.add(new_sub)
+        record_completion(task.assigned_to, task.course_id, "task")
     else:
         existing_sub.submitted_at = datetime.utcnow()
         if file_path: existing_sub.file_path = file_path
         
     db.session.commit()
+    if not existing_sub:
+        adjust_platform_stats("task_submissions")
+    invalidate_students(task.assigned_to)
+    invalidate_trainer_internship(task.internship_id)
     return jsonify({"message": "Task completed"}), 200
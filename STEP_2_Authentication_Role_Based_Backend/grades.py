@@ -0,0 +1,82 @@
+from sqlalchemy import func
+
+from extensions import db
+from models import User, Submission, TaskSubmission
+from utils import parse_grade
+
+
+def set_grade(submission, grade):
+    """Stores a trainer's grade with its parsed numeric value and keeps the student's running average in step"""
+    old_value = submission.grade_value
+    submission.grade = grade
+    submission.grade_value = parse_grade(grade)
+
+    # Only assignment submissions feed the student's overall grade
+    if isinstance(submission, Submission):
+        _apply_to_student(submission.student_id, old_value, -1)
+        _apply_to_student(submission.student_id, submission.grade_value, 1)
+
+
+def _apply_to_student(student_id, value, sign):
+    if value is None:
+        return
+    User.query.filter_by(id=student_id).update({
+        User.grade_total: func.coalesce(User.grade_total, 0) + sign * value,
+        User.grade_count: func.coalesce(User.grade_count, 0) + sign
+    }, synchronize_session=False)
+
+
+def forget_grades(submission_filter):
+    """Takes graded assignment submissions that are about to be deleted out of their students' averages"""
+    rows = db.session.query(Submission.student_id, func.sum(Submission.grade_value), func.count(Submission.grade_value)) \
+        .filter(submission_filter, Submission.grade_value.isnot(None)) \
+        .group_by(Submission.student_id).all()
+
+    for student_id, total, count in rows:
+        User.query.filter_by(id=student_id).update({
+            User.grade_total: func.coalesce(User.grade_total, 0) - total,
+            User.grade_count: func.coalesce(User.grade_count, 0) - count
+        }, synchronize_session=False)
+
+    # Mark them accounted for, so a retried delete (an interrupted purge) does not subtract them twice
+    if rows:
+        Submission.query.filter(submission_filter, Submission.grade_value.isnot(None)) \
+            .update({Submission.grade_value: None}, synchronize_session=False)
+
+
+def overall_grade(user):
+    """Overall grade string for the dashboard, read straight from the user's running aggregate"""
+    if not user or not user.grade_count:
+        return "N/A"
+    return f"{int((user.grade_total or 0) / user.grade_count)}%"
+
+
+def backfill_grades(chunk_size=1000):
+    """Parses existing free-text grades into grade_value and rebuilds every student's aggregate"""
+    converted = 0
+    for model in (Submission, TaskSubmission):
+        last_id = 0
+        while True:
+            rows = db.session.query(model.id, model.grade) \
+                .filter(model.id > last_id, model.grade.isnot(None), model.grade_value.is_(None)) \
+                .order_by(model.id).limit(chunk_size).all()
+            if not rows:
+                break
+            mappings = [{"id": rid, "grade_value": parse_grade(grade)} for rid, grade in rows]
+            mappings = [m for m in mappings if m["grade_value"] is not None]
+            if mappings:
+                db.session.bulk_update_mappings(model, mappings)
+            db.session.commit()
+            converted += len(mappings)
+            last_id = rows[-1][0]
+
+    # Rebuild the running aggregates in one grouped pass
+    totals = db.session.query(Submission.student_id, func.sum(Submission.grade_value), func.count(Submission.grade_value)) \
+        .filter(Submission.grade_value.isnot(None)) \
+        .group_by(Submission.student_id).all()
+    User.query.update({User.grade_total: 0, User.grade_count: 0}, synchronize_session=False)
+    db.session.bulk_update_mappings(User, [
+        {"id": student_id, "grade_total": total, "grade_count": count} for student_id, total, count in totals
+    ])
+    db.session.commit()
+    return converted
@@ -0,0 +1,188 @@
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import func, inspect, insert, select
+
+from extensions import db
+from models import SchemaMigration
+from trainers import backfill_trainer_ids
+from grades import backfill_grades
+from tasks import migrate_task_templates, backfill_task_courses
+from progress import reconcile_progress
+
+# ================= SCHEMA MIGRATIONS =================
+# Every schema change is a numbered step applied once and recorded in schema_migrations. Steps
+# check the live schema before altering it, so databases that went through the old boot-time
+# ALTER TABLE attempts are brought to the same version without errors. A step also backfills the
+# data its columns depend on, so a database at version N is complete at N. Append new steps only.
+
+LOCK_NAME = "skilltrack_migrations"
+LOCK_TIMEOUT = 60  # Seconds a worker waits for another worker's migration run
+
+
+def _columns(table):
+    return {c["name"] for c in inspect(db.engine).get_columns(table)}
+
+
+def _add_columns(table, *definitions):
+    """ALTER TABLE ... ADD COLUMN for each "name TYPE ..." the table does not have yet"""
+    existing = _columns(table)
+    for definition in definitions:
+        if definition.split()[0] not in existing:
+            with db.engine.begin() as conn:
+                conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {definition}")
+
+
+def _create_index(table, name, columns):
+    if name in {ix["name"] for ix in inspect(db.engine).get_indexes(table)}:
+        return
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql(f"CREATE INDEX {name} ON {table} ({columns})")
+
+
+def _is_mysql():
+    return db.engine.dialect.name == "mysql"
+
+
+def create_tables():
+    db.create_all()
+
+
+def legacy_columns():
+    _add_columns("users", "last_activity_date DATE", "current_streak INTEGER DEFAULT 0")
+    # Pre-template databases still carry the task content on tasks; the template split reads week_number
+    if "title" in _columns("tasks"):
+        _add_columns("tasks", "week_number INTEGER DEFAULT 1")
+    _add_columns("tasks", "internship_id INTEGER", "course_id INTEGER")
+    _add_columns("enrollments", "internship_id INTEGER")
+    if _is_mysql() and not next(c for c in inspect(db.engine).get_columns("enrollments") if c["name"] == "course_id")["nullable"]:
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("ALTER TABLE enrollments MODIFY COLUMN course_id INTEGER NULL")
+    _add_columns("courses", "assignment_limit INTEGER", "quiz_limit INTEGER")
+    _add_columns("internships", "assignment_limit INTEGER")
+
+
+def progress_counters():
+    _add_columns("student_progress", *[
+        f"{col} INTEGER DEFAULT 0" for col in ("quizzes_completed", "total_quizzes", "tasks_completed", "total_tasks")
+    ])
+    # The new counters start at 0 and are read as authoritative: fill them from the existing rows
+    reconcile_progress()
+
+
+def numeric_grades():
+    _add_columns("submissions", "grade_value FLOAT")
+    _add_columns("task_submissions", "grade_value FLOAT")
+    _add_columns("users", "grade_total FLOAT DEFAULT 0", "grade_count INTEGER DEFAULT 0")
+    # Parse the existing free-text grades and build every student's aggregate from them
+    backfill_grades()
+
+
+def trainer_links():
+    for table in ("courses", "internships"):
+        _add_columns(table, "trainer_id INTEGER NULL")
+        _create_index(table, f"ix_{table}_trainer_id", "trainer_id")
+        fks = {fk["name"] for fk in inspect(db.engine).get_foreign_keys(table)}
+        if _is_mysql() and f"fk_{table}_trainer" not in fks:
+            with db.engine.begin() as conn:
+                conn.exec_driver_sql(
+                    f"ALTER TABLE {table} ADD CONSTRAINT fk_{table}_trainer FOREIGN KEY (trainer_id) REFERENCES users (id)"
+                )
+    # Link rows created before trainer_id existed (trainers registering later claim theirs on register)
+    backfill_trainer_ids()
+    db.session.commit()
+
+
+def quiz_answers():
+    _add_columns("quiz_submissions", "answers TEXT")
+
+
+def feed_indexes():
+    _create_index("submissions", "ix_submissions_assignment_submitted", "assignment_id, submitted_at, id")
+    _create_index("task_submissions", "ix_task_submissions_task_submitted", "task_id, submitted_at, id")
+    # tasks.internship_id was added by ALTER on older databases, without the FK's index
+    _create_index("tasks", "ix_tasks_internship_id", "internship_id")
+    # Admin stats count users per role straight off this index
+    _create_index("users", "ix_users_role", "role")
+
+
+def task_templates():
+    # Split legacy per-student task copies into task_templates + slim tasks rows
+    migrate_task_templates()
+
+
+def task_courses():
+    # Tasks from before course_id existed take the assignee's first course enrollment
+    if backfill_task_courses():
+        reconcile_progress()  # Those tasks now count towards the course's stored counters
+
+
+def certificate_fingerprints():
+    _add_columns("certificates", "fingerprint VARCHAR(64)")
+
+
+MIGRATIONS = [
+    (1, "create_tables", create_tables),
+    (2, "legacy_columns", legacy_columns),
+    (3, "progress_counters", progress_counters),
+    (4, "numeric_grades", numeric_grades),
+    (5, "trainer_links", trainer_links),
+    (6, "quiz_answers", quiz_answers),
+    (7, "feed_indexes", feed_indexes),
+    (8, "task_templates", task_templates),
+    (9, "task_courses", task_courses),
+    (10, "certificate_fingerprints", certificate_fingerprints),
+]
+LATEST = MIGRATIONS[-1][0]
+
+
+def current_version():
+    """Highest applied version, 0 for a database that has never been migrated"""
+    try:
+        with db.engine.connect() as conn:
+            return conn.execute(select(func.max(SchemaMigration.version))).scalar() or 0
+    except Exception:
+        return 0
+
+
+@contextmanager
+def _migration_lock():
+    """Serializes migration runs across workers; MySQL named lock, other databases run unlocked"""
+    if not _is_mysql():
+        yield
+        return
+    with db.engine.connect() as conn:
+        if not conn.exec_driver_sql(f"SELECT GET_LOCK('{LOCK_NAME}', {LOCK_TIMEOUT})").scalar():
+            raise RuntimeError("Timed out waiting for another worker's migrations")
+        try:
+            yield
+        finally:
+            conn.exec_driver_sql(f"SELECT RELEASE_LOCK('{LOCK_NAME}')")
+
+
+def run_migrations():
+    """Applies pending migrations in order. A warm boot costs the single version SELECT.
+
+    Returns the names of the migrations applied. A failing step is rolled back and re-raised, so
+    the app never serves against a partially migrated schema; steps applied before it stay
+    recorded and the run resumes from the failed step on the next boot (or `flask --app app migrate`).
+    """
+    if current_version() >= LATEST:
+        return []
+
+    applied = []
+    with _migration_lock():
+        # Another worker may have finished while we waited for the lock
+        version = current_version()
+        for number, name, step in MIGRATIONS:
+            if number <= version:
+                continue
+            try:
+                step()
+                with db.engine.begin() as conn:
+                    conn.execute(insert(SchemaMigration), {"version": number, "name": name, "applied_at": datetime.utcnow()})
+            except Exception as e:
+                db.session.rollback()
+                raise RuntimeError(f"Migration {number} ({name}) failed: {e}") from e
+            applied.append(name)
+    return applied
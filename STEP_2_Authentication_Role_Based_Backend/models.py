@@ -9,7 +9,7 @@ class User(db.Model):
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False)
     password = db.Column(db.String(200), nullable=False)
-    role = db.Column(db.String(20), nullable=False)
+    role = db.Column(db.String(20), nullable=False, index=True)
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -17,6 +17,10 @@ class User(db.Model):
     last_activity_date = db.Column(db.Date, nullable=True) # Will store just YYYY-MM-DD
     current_streak = db.Column(db.Integer, default=0)
 
+    # ✅ NEW: Running overall grade (sum / count of numeric assignment grades, see grades.py)
+    grade_total = db.Column(db.Float, default=0)
+    grade_count = db.Column(db.Integer, default=0)
+
     enrollments = db.relationship("Enrollment", backref="user", lazy=True)
 
     def __repr__(self):
@@ -32,7 +36,8 @@ class Course(db.Model):
     start_date = db.Column(db.String(50), nullable=False)
 
     # ✅ NEW FIELDS
-    mentor_name = db.Column(db.String(100), nullable=False)
+    mentor_name = db.Column(db.String(100), nullable=False)  # Display name; ownership is trainer_id
+    trainer_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True, index=True)
     duration = db.Column(db.String(50), nullable=False)
     assignment_limit = db.Column(db.Integer, nullable=True)  # Trainer-defined limit (None = unlimited)
     quiz_limit = db.Column(db.Integer, nullable=True)  # Trainer-defined limit (None = unlimited)
@@ -92,6 +97,12 @@ class StudentProgress(db.Model):
     assignments_completed = db.Column(db.Integer, default=0)
     total_assignments = db.Column(db.Integer, default=0)
 
+    # ✅ Maintained as deltas on submission / assignment events (see progress.py)
+    quizzes_completed = db.Column(db.Integer, default=0)
+    total_quizzes = db.Column(db.Integer, default=0)
+    tasks_completed = db.Column(db.Integer, default=0)
+    total_tasks = db.Column(db.Integer, default=0)
+
     updated_at = db.Column(
         db.DateTime,
         default=datetime.utcnow,
@@ -115,20 +126,45 @@ class Internship(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     intern_name = db.Column(db.String(100))
-    mentor_name = db.Column(db.String(100))
+    mentor_name = db.Column(db.String(100))  # Display name; ownership is trainer_id
+    trainer_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True, index=True)
     duration = db.Column(db.String(50))
     assignment_limit = db.Column(db.Integer, nullable=True)  # Trainer-defined limit
 
     tasks = db.relationship("Task", backref="internship", lazy=True)
     enrollments = db.relationship("Enrollment", backref="internship", lazy=True)
 
+# ================= TASK TEMPLATES =================
+# Content shared by every copy of a task; one row per task the trainer creates
+class TaskTemplate(db.Model):
+    __tablename__ = "task_templates"
+
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(150), nullable=False)
+    description = db.Column(db.Text)
+
+    assigned_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    internship_id = db.Column(db.Integer, db.ForeignKey("internships.id"), nullable=True, index=True)
+    course_id = db.Column(db.Integer, db.ForeignKey("courses.id"), nullable=True, index=True)
+
+    priority = db.Column(db.String(20), default="Medium")
+    week_number = db.Column(db.Integer, default=1)
+    due_date = db.Column(db.String(50))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 # ================= TASKS (INTERNSHIP TASKS) =================
+# One slim row per assignee: status plus foreign keys, content lives on the template
 class Task(db.Model):
     __tablename__ = "tasks"
 
     id = db.Column(db.Integer, primary_key=True)
-    title = db.Column(db.String(150), nullable=False)
-    description = db.Column(db.Text)
+
+    template_id = db.Column(
+        db.Integer,
+        db.ForeignKey("task_templates.id"),
+        nullable=False,
+        index=True
+    )
 
     assigned_to = db.Column(
         db.Integer,
@@ -155,11 +191,32 @@ class Task(db.Model):
     )
 
     status = db.Column(db.String(50), default="Pending")
-    priority = db.Column(db.String(20), default="Medium")
-    week_number = db.Column(db.Integer, default=1)   # ✅ Added for parity with Assignments
-    due_date = db.Column(db.String(50))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Joined on every load, so reading t.title never costs a query
+    template = db.relationship("TaskTemplate", lazy="joined", backref=db.backref("tasks", lazy=True))
+
+    # Read-only views of the shared content; edit the template to change them for every assignee
+    @property
+    def title(self):
+        return self.template.title
+
+    @property
+    def description(self):
+        return self.template.description
+
+    @property
+    def priority(self):
+        return self.template.priority
+
+    @property
+    def week_number(self):
+        return self.template.week_number
+
+    @property
+    def due_date(self):
+        return self.template.due_date
+
 # ================= ASSIGNMENTS (COURSE WORK) =================
 class Assignment(db.Model):
     __tablename__ = "assignments"
@@ -184,6 +241,10 @@ class Assignment(db.Model):
 # ================= SUBMISSIONS =================
 class Submission(db.Model):
     __tablename__ = "submissions"
+    __table_args__ = (
+        # Grading feeds page through an assignment's submissions on (submitted_at, id)
+        db.Index("ix_submissions_assignment_submitted", "assignment_id", "submitted_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -204,10 +265,14 @@ class Submission(db.Model):
     feedback = db.Column(db.String(255))
     status = db.Column(db.String(50), default="Pending")
     grade = db.Column(db.String(50))
+    grade_value = db.Column(db.Float, nullable=True)  # Parsed 0-100 value of grade
 
 # ================= TASK SUBMISSIONS (INTERNSHIPS) =================
 class TaskSubmission(db.Model):
     __tablename__ = "task_submissions"
+    __table_args__ = (
+        db.Index("ix_task_submissions_task_submitted", "task_id", "submitted_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -228,6 +293,7 @@ class TaskSubmission(db.Model):
     feedback = db.Column(db.String(255))
     status = db.Column(db.String(50), default="Pending")
     grade = db.Column(db.String(50))
+    grade_value = db.Column(db.Float, nullable=True)  # Parsed 0-100 value of grade
 
 
 # ================= COURSE RESOURCES =================
@@ -261,6 +327,8 @@ class Certificate(db.Model):
     course_id = db.Column(db.Integer, db.ForeignKey("courses.id"), nullable=False)
     certificate_url = db.Column(db.String(255))
     issued_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # CertificateTemplate.fingerprint() of what the stored PDF shows; a mismatch means re-render
+    fingerprint = db.Column(db.String(64))
 
 # ================= QUIZZES =================
 class Quiz(db.Model):
@@ -296,4 +364,13 @@ class QuizSubmission(db.Model):
     student_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     score = db.Column(db.Integer, nullable=False)
     total_questions = db.Column(db.Integer, nullable=False)
-    submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
+    answers = db.Column(db.Text, nullable=True)  # One letter per question in id order, "-" = unanswered
+    submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
+# ================= SCHEMA VERSION =================
+class SchemaMigration(db.Model):
+    """One row per applied migration (see migrations.py)"""
+    __tablename__ = "schema_migrations"
+
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(100), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
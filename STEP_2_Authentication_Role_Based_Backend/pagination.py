@@ -0,0 +1,59 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(values):
+    """Opaque cursor for the sort key of the last row on a page"""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor, columns):
+    """Sort key values from a cursor, typed per column. Raises ValueError for a malformed cursor."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+    return [
+        datetime.fromisoformat(v) if v is not None and col.type.python_type is datetime else v
+        for col, v in zip(columns, values)
+    ]
+
+
+def _after(columns, values):
+    # (a, b) > (x, y) spelled out as a > x OR (a = x AND b > y) so every database can seek the index.
+    # NULLs sort first in ascending order (MySQL, SQLite), so every non-NULL value comes after a NULL
+    # one, and "c == None" already renders as IS NULL
+    clauses = []
+    for i, (col, value) in enumerate(zip(columns, values)):
+        equal = [c == v for c, v in zip(columns[:i], values[:i])]
+        clauses.append(and_(*equal, col.isnot(None) if value is None else col > value))
+    return or_(*clauses)
+
+
+def keyset_page(query, columns, key, cursor=None, limit=None, max_limit=MAX_PAGE_SIZE):
+    """Runs query ordered by columns (ascending, last column unique) one page at a time.
+
+    key(row) returns a row's values for columns. Without a limit every row is returned in a single
+    query. Returns (rows, next_cursor) where next_cursor is None on the last page.
+    """
+    if cursor:
+        query = query.filter(_after(columns, decode_cursor(cursor, columns)))
+    query = query.order_by(*columns)
+
+    if not limit:
+        return query.all(), None
+
+    limit = max(1, min(int(limit), max_limit))
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
@@ -0,0 +1,326 @@
+from types import SimpleNamespace
+
+from sqlalchemy import func, and_
+from sqlalchemy.orm import load_only
+
+from bulk import update_rows
+from extensions import db
+from models import Course, StudentProgress, Assignment, Submission, Quiz, QuizSubmission, Task, TaskSubmission
+
+# Stored counter columns on StudentProgress for each kind of course item: (completed, total)
+COUNTER_FIELDS = {
+    "assignment": ("assignments_completed", "total_assignments"),
+    "quiz": ("quizzes_completed", "total_quizzes"),
+    "task": ("tasks_completed", "total_tasks")
+}
+
+
+def _empty_counts():
+    return {
+        "assignments_total": 0,
+        "assignments_done": 0,
+        "quizzes_total": 0,
+        "quizzes_done": 0,
+        "tasks_total": 0,
+        "tasks_done": 0
+    }
+
+
+def get_progress_counts(student_id, course_ids=(), internship_ids=()):
+    """Completion counts for all of a student's courses and internships using a fixed number of grouped queries"""
+    course_ids = {cid for cid in course_ids if cid}
+    internship_ids = {iid for iid in internship_ids if iid}
+
+    courses = {cid: _empty_counts() for cid in course_ids}
+    internships = {iid: _empty_counts() for iid in internship_ids}
+
+    if course_ids:
+        # 1. Assignments per course / distinct assignments submitted by this student
+        rows = db.session.query(Assignment.course_id, func.count(Assignment.id)) \
+            .filter(Assignment.course_id.in_(course_ids)) \
+            .group_by(Assignment.course_id).all()
+        for cid, total in rows:
+            courses[cid]["assignments_total"] = total
+
+        rows = db.session.query(Assignment.course_id, func.count(func.distinct(Submission.assignment_id))) \
+            .join(Submission, Submission.assignment_id == Assignment.id) \
+            .filter(Submission.student_id == student_id, Assignment.course_id.in_(course_ids)) \
+            .group_by(Assignment.course_id).all()
+        for cid, done in rows:
+            courses[cid]["assignments_done"] = done
+
+        # 2. Quizzes per course / distinct quizzes attempted by this student
+        rows = db.session.query(Quiz.course_id, func.count(Quiz.id)) \
+            .filter(Quiz.course_id.in_(course_ids)) \
+            .group_by(Quiz.course_id).all()
+        for cid, total in rows:
+            courses[cid]["quizzes_total"] = total
+
+        rows = db.session.query(Quiz.course_id, func.count(func.distinct(QuizSubmission.quiz_id))) \
+            .join(QuizSubmission, QuizSubmission.quiz_id == Quiz.id) \
+            .filter(QuizSubmission.student_id == student_id, Quiz.course_id.in_(course_ids)) \
+            .group_by(Quiz.course_id).all()
+        for cid, done in rows:
+            courses[cid]["quizzes_done"] = done
+
+    if course_ids or internship_ids:
+        # 3. Tasks assigned to the student, with the ones they have submitted
+        rows = db.session.query(
+                Task.course_id,
+                Task.internship_id,
+                func.count(func.distinct(Task.id)),
+                func.count(func.distinct(TaskSubmission.task_id))
+            ) \
+            .outerjoin(TaskSubmission, and_(TaskSubmission.task_id == Task.id, TaskSubmission.student_id == student_id)) \
+            .filter(Task.assigned_to == student_id) \
+            .group_by(Task.course_id, Task.internship_id).all()
+        for cid, iid, total, done in rows:
+            for bucket, key in ((courses, cid), (internships, iid)):
+                if key in bucket:
+                    bucket[key]["tasks_total"] += total
+                    bucket[key]["tasks_done"] += done
+
+    return courses, internships
+
+
+def summarize_course(course, counts):
+    """Applies trainer-defined limits to raw counts and derives the progress percentage"""
+    asgn_total = max(counts["assignments_total"], course.assignment_limit or 0)
+    quiz_total = max(counts["quizzes_total"], course.quiz_limit or 0)
+
+    total_items = asgn_total + quiz_total + counts["tasks_total"]
+    done_items = counts["assignments_done"] + counts["quizzes_done"] + counts["tasks_done"]
+    progress = int((done_items / max(total_items, 1)) * 100) if total_items > 0 else 0
+
+    return {
+        "assignments_completed": counts["assignments_done"],
+        "total_assignments": asgn_total,
+        "quizzes_completed": counts["quizzes_done"],
+        "total_quizzes": quiz_total,
+        "tasks_completed": counts["tasks_done"],
+        "total_tasks": counts["tasks_total"],
+        "progress": progress
+    }
+
+
+def summarize_internship(counts):
+    """Progress for an internship is purely task based"""
+    total = counts["tasks_total"]
+    done = counts["tasks_done"]
+    progress = int((done / max(total, 1)) * 100) if total > 0 else 0
+
+    return {
+        "tasks_completed": done,
+        "total_tasks": total,
+        "progress": progress
+    }
+
+
+# ================= STORED COUNTERS =================
+
+def counts_from_row(row):
+    """Reads the stored StudentProgress counters in the same shape as get_progress_counts"""
+    return {
+        "assignments_total": row.total_assignments or 0,
+        "assignments_done": row.assignments_completed or 0,
+        "quizzes_total": row.total_quizzes or 0,
+        "quizzes_done": row.quizzes_completed or 0,
+        "tasks_total": row.total_tasks or 0,
+        "tasks_done": row.tasks_completed or 0
+    }
+
+
+def _progress_status(course, counts, status):
+    """Stored percentage and status for a set of counters"""
+    progress = min(summarize_course(course, counts)["progress"], 100)
+    if progress >= 100:
+        status = "Completed"
+    elif status == "Completed":
+        status = "On Track"
+    return progress, status
+
+
+def refresh_progress(row, course):
+    """Re-derives the stored percentage and status from the row's counters"""
+    if not course:
+        return
+    row.progress, row.status = _progress_status(course, counts_from_row(row), row.status)
+
+
+def _apply_delta(row, field, delta):
+    setattr(row, field, max((getattr(row, field) or 0) + delta, 0))
+
+
+# Everything needed to move a progress row's counters without loading it into the session
+_COUNTER_COLUMNS = [getattr(StudentProgress, field) for pair in COUNTER_FIELDS.values() for field in pair]
+_PROGRESS_COLUMNS = (StudentProgress.id, StudentProgress.user_id, StudentProgress.course_id, StudentProgress.status,
+                     *_COUNTER_COLUMNS)
+
+
+def _counter_mapping(row, course, deltas):
+    """bulk_update_mappings entry for a _PROGRESS_COLUMNS row with deltas ({field: delta}) applied"""
+    mapping = {column.key: getattr(row, column.key) for column in _COUNTER_COLUMNS}
+    for field, delta in deltas.items():
+        mapping[field] = max((mapping[field] or 0) + delta, 0)
+    if course:
+        mapping["progress"], mapping["status"] = _progress_status(
+            course, counts_from_row(SimpleNamespace(**mapping)), row.status
+        )
+    mapping["id"] = row.id
+    return mapping
+
+
+def record_completion(student_id, course_id, kind, delta=1):
+    """A student completed (delta=1) or lost (delta=-1) one item of a course"""
+    if not course_id:
+        return
+    row = StudentProgress.query.filter_by(user_id=student_id, course_id=course_id).first()
+    if not row:
+        return
+    _apply_delta(row, COUNTER_FIELDS[kind][0], delta)
+    refresh_progress(row, Course.query.get(course_id))
+
+
+def record_course_item(course_id, kind, delta=1, student_ids=None, completed_by=()):
+    """An item was added to (delta=1) or removed from (delta=-1) a course.
+
+    student_ids limits the change to specific students (tasks are per student),
+    completed_by lists students whose completed count also moves with a removal.
+    Rows are read as plain tuples and written back with batched UPDATEs, so a whole
+    cohort costs a handful of statements instead of one ORM flush per student.
+    Returns the number of progress rows changed.
+    """
+    if not course_id:
+        return 0
+    done_field, total_field = COUNTER_FIELDS[kind]
+    completed_by = set(completed_by)
+
+    rows = db.session.query(*_PROGRESS_COLUMNS).filter(StudentProgress.course_id == course_id)
+    if student_ids is not None:
+        if not student_ids:
+            return 0
+        rows = rows.filter(StudentProgress.user_id.in_({int(sid) for sid in student_ids}))
+
+    course = Course.query.get(course_id)
+    mappings = []
+    for row in rows:
+        deltas = {total_field: delta}
+        if row.user_id in completed_by:
+            deltas[done_field] = delta
+        mappings.append(_counter_mapping(row, course, deltas))
+    return update_rows(StudentProgress, mappings)
+
+
+def forget_tasks(task_filter):
+    """Takes a set of course tasks that is about to be deleted off the affected students' counters.
+
+    One grouped read of the tasks, one read of the affected progress rows and batched UPDATEs,
+    whatever the number of students. Returns the number of progress rows changed.
+    """
+    rows = db.session.query(
+            Task.assigned_to,
+            Task.course_id,
+            func.count(func.distinct(Task.id)),
+            func.count(func.distinct(TaskSubmission.task_id))
+        ) \
+        .outerjoin(TaskSubmission, and_(TaskSubmission.task_id == Task.id, TaskSubmission.student_id == Task.assigned_to)) \
+        .filter(task_filter, Task.course_id.isnot(None)) \
+        .group_by(Task.assigned_to, Task.course_id).all()
+    if not rows:
+        return 0
+
+    removed = {(student_id, course_id): (total, done) for student_id, course_id, total, done in rows}
+    course_ids = {course_id for _, course_id in removed}
+    courses = {c.id: c for c in Course.query.filter(Course.id.in_(course_ids))}
+
+    progress_rows = db.session.query(*_PROGRESS_COLUMNS).filter(
+        StudentProgress.course_id.in_(course_ids),
+        StudentProgress.user_id.in_({student_id for student_id, _ in removed})
+    )
+
+    mappings = []
+    for row in progress_rows:
+        if (row.user_id, row.course_id) in removed:
+            total, done = removed[(row.user_id, row.course_id)]
+            mappings.append(_counter_mapping(row, courses.get(row.course_id), {"total_tasks": -total, "tasks_completed": -done}))
+    # Detach the tasks from their course: a retried delete (an interrupted purge) skips them
+    Task.query.filter(task_filter, Task.course_id.isnot(None)) \
+        .update({Task.course_id: None}, synchronize_session=False)
+    return update_rows(StudentProgress, mappings)
+
+
+def recalculate_progress(student_id, course_id):
+    """Rebuilds a single progress row from scratch (used when a student enrolls)"""
+    row = StudentProgress.query.filter_by(user_id=student_id, course_id=course_id).first()
+    if not row:
+        return None
+    counts = get_progress_counts(student_id, [course_id])[0][course_id]
+    _store_counts(row, counts)
+    refresh_progress(row, Course.query.get(course_id))
+    return row
+
+
+def _store_counts(row, counts):
+    row.total_assignments = counts["assignments_total"]
+    row.assignments_completed = counts["assignments_done"]
+    row.total_quizzes = counts["quizzes_total"]
+    row.quizzes_completed = counts["quizzes_done"]
+    row.total_tasks = counts["tasks_total"]
+    row.tasks_completed = counts["tasks_done"]
+
+
+def reconcile_progress(course_id=None):
+    """Rebuilds every StudentProgress counter in bulk with one grouped query per item kind"""
+    rows = StudentProgress.query
+    if course_id:
+        rows = rows.filter_by(course_id=course_id)
+    rows = rows.all()
+    course_ids = {r.course_id for r in rows}
+    if not course_ids:
+        return 0
+
+    assignment_totals = dict(db.session.query(Assignment.course_id, func.count(Assignment.id))
+                             .filter(Assignment.course_id.in_(course_ids))
+                             .group_by(Assignment.course_id).all())
+    quiz_totals = dict(db.session.query(Quiz.course_id, func.count(Quiz.id))
+                       .filter(Quiz.course_id.in_(course_ids))
+                       .group_by(Quiz.course_id).all())
+
+    assignments_done = {(sid, cid): n for sid, cid, n in db.session.query(
+            Submission.student_id, Assignment.course_id, func.count(func.distinct(Submission.assignment_id)))
+        .join(Assignment, Assignment.id == Submission.assignment_id)
+        .filter(Assignment.course_id.in_(course_ids))
+        .group_by(Submission.student_id, Assignment.course_id).all()}
+
+    quizzes_done = {(sid, cid): n for sid, cid, n in db.session.query(
+            QuizSubmission.student_id, Quiz.course_id, func.count(func.distinct(QuizSubmission.quiz_id)))
+        .join(Quiz, Quiz.id == QuizSubmission.quiz_id)
+        .filter(Quiz.course_id.in_(course_ids))
+        .group_by(QuizSubmission.student_id, Quiz.course_id).all()}
+
+    tasks = {(sid, cid): (total, done) for sid, cid, total, done in db.session.query(
+            Task.assigned_to, Task.course_id,
+            func.count(func.distinct(Task.id)), func.count(func.distinct(TaskSubmission.task_id)))
+        .outerjoin(TaskSubmission, and_(TaskSubmission.task_id == Task.id, TaskSubmission.student_id == Task.assigned_to))
+        .filter(Task.course_id.in_(course_ids))
+        .group_by(Task.assigned_to, Task.course_id).all()}
+
+    # Only the limit columns: this also runs as migration 3, before later migrations add course columns
+    courses = {c.id: c for c in Course.query.options(load_only(Course.id, Course.assignment_limit, Course.quiz_limit))
+               .filter(Course.id.in_(course_ids)).all()}
+
+    for row in rows:
+        key = (row.user_id, row.course_id)
+        task_total, task_done = tasks.get(key, (0, 0))
+        _store_counts(row, {
+            "assignments_total": assignment_totals.get(row.course_id, 0),
+            "assignments_done": assignments_done.get(key, 0),
+            "quizzes_total": quiz_totals.get(row.course_id, 0),
+            "quizzes_done": quizzes_done.get(key, 0),
+            "tasks_total": task_total,
+            "tasks_done": task_done
+        })
+        refresh_progress(row, courses.get(row.course_id))
+
+    db.session.commit()
+    return len(rows)
@@ -0,0 +1,138 @@
+import hashlib
+import threading
+
+import numpy as np
+
+from config import Config
+from cache import TTLCache
+from extensions import db
+from models import Question, QuizSubmission
+
+OPTIONS = "ABCD"
+UNANSWERED = "-"
+
+
+def encode_answers(questions, answers):
+    """Packs a student's answers into one character per question, in question id order ("-" = unanswered)"""
+    chosen = []
+    for q in sorted(questions, key=lambda q: q.id):
+        ans = str(answers.get(str(q.id)) or "").strip().upper()
+        chosen.append(ans if len(ans) == 1 and ans in OPTIONS else UNANSWERED)
+    return "".join(chosen)
+
+
+class QuizStats:
+    """Sufficient statistics of a quiz's attempts, kept as arrays over questions.
+
+    Holds attempt count, sum and sum of squares of total scores and, per question, correct count,
+    total score of the students who got it right and option counts. Every report figure derives
+    from these, so a new attempt is folded in with a few vector adds instead of a rebuild.
+    """
+
+    def __init__(self, key, signature=None):
+        self.key = np.frombuffer(key.encode(), dtype=np.uint8)
+        self.signature = signature
+        self.options = np.frombuffer(OPTIONS.encode(), dtype=np.uint8)
+        n_questions = len(self.key)
+
+        self.attempts = 0
+        self.score_sum = 0.0
+        self.score_sq_sum = 0.0
+        self.correct = np.zeros(n_questions, dtype=np.int64)
+        self.correct_score_sum = np.zeros(n_questions, dtype=np.float64)
+        self.option_counts = np.zeros((n_questions, len(OPTIONS)), dtype=np.int64)
+
+        self.last_submission_id = 0
+        self.lock = threading.Lock()
+
+    def add(self, answer_strings):
+        """Folds a batch of encoded answer strings in; strings of the wrong length are skipped"""
+        rows = [a for a in answer_strings if a and len(a) == len(self.key)]
+        if not rows or not len(self.key):
+            return
+        matrix = np.frombuffer("".join(rows).encode(), dtype=np.uint8).reshape(len(rows), len(self.key))
+
+        is_correct = matrix == self.key                  # attempts x questions
+        scores = is_correct.sum(axis=1).astype(np.float64)
+
+        self.attempts += len(rows)
+        self.score_sum += scores.sum()
+        self.score_sq_sum += (scores ** 2).sum()
+        self.correct += is_correct.sum(axis=0)
+        self.correct_score_sum += scores @ is_correct
+        self.option_counts += (matrix[:, :, None] == self.options).sum(axis=0)
+
+    def report(self):
+        """Per-question p-correct, option frequencies and point-biserial discrimination"""
+        n = self.attempts
+        if not n:
+            return {"mean_score": None, "p_correct": [], "option_frequencies": [], "point_biserial": []}
+
+        mean = self.score_sum / n
+        sd = np.sqrt(max(self.score_sq_sum / n - mean ** 2, 0.0))
+        p = self.correct / n
+
+        # r_pb = (M1 - M0) / sd * sqrt(p * q), M1 / M0 the mean totals of students right / wrong
+        with np.errstate(divide="ignore", invalid="ignore"):
+            m1 = self.correct_score_sum / self.correct
+            m0 = (self.score_sum - self.correct_score_sum) / (n - self.correct)
+            r_pb = (m1 - m0) / sd * np.sqrt(p * (1 - p))
+        r_pb = [round(float(r), 3) if np.isfinite(r) else None for r in r_pb]
+
+        return {
+            "mean_score": round(mean, 2),
+            "p_correct": np.round(p, 3).tolist(),
+            "option_frequencies": np.round(self.option_counts / n, 3).tolist(),
+            "point_biserial": r_pb
+        }
+
+
+# Per-process, like the dashboard caches. Entries catch up on newer attempts on every read; the
+# TTL only bounds how long removed attempts (deleted students) keep counting in other workers.
+quiz_stats_cache = TTLCache(Config.QUIZ_STATS_CACHE_SIZE, Config.QUIZ_STATS_CACHE_TTL)
+
+
+def quiz_analytics(quiz):
+    questions = Question.query.filter_by(quiz_id=quiz.id).order_by(Question.id).all()
+    key = "".join(q.correct_answer.strip().upper()[:1] or UNANSWERED for q in questions)
+
+    # Hash of the questions and answer key the statistics were built for: any edit rebuilds them
+    signature = hashlib.sha1(f"{[q.id for q in questions]}:{key}".encode()).hexdigest()
+
+    stats = quiz_stats_cache.get(quiz.id)
+    if stats is None or stats.signature != signature:
+        stats = QuizStats(key, signature)
+        quiz_stats_cache.set(quiz.id, stats)
+
+    with stats.lock:
+        # Only attempts newer than the cached snapshot are read and folded in
+        rows = db.session.query(QuizSubmission.id, QuizSubmission.answers) \
+            .filter(QuizSubmission.quiz_id == quiz.id, QuizSubmission.id > stats.last_submission_id) \
+            .order_by(QuizSubmission.id).all()
+        if rows:
+            stats.add([answers for _, answers in rows])
+            stats.last_submission_id = rows[-1][0]
+        report = stats.report()
+        analyzed = stats.attempts
+
+    total_attempts = QuizSubmission.query.filter_by(quiz_id=quiz.id).count()
+
+    question_list = []
+    for i, q in enumerate(questions):
+        question_list.append({
+            "question_id": q.id,
+            "text": q.text,
+            "correct_answer": q.correct_answer,
+            "p_correct": report["p_correct"][i] if analyzed else None,
+            "option_frequencies": dict(zip(OPTIONS, report["option_frequencies"][i])) if analyzed else {},
+            "point_biserial": report["point_biserial"][i] if analyzed else None
+        })
+
+    return {
+        "quiz_id": quiz.id,
+        "title": quiz.title,
+        "attempts": total_attempts,
+        "analyzed_attempts": analyzed,  # Attempts made before answers were stored are not itemised
+        "mean_score": report["mean_score"],
+        "questions": question_list
+    }
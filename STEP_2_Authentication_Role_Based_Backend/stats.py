@@ -0,0 +1,53 @@
+from sqlalchemy import func, literal, union_all
+
+from config import Config
+from cache import TTLCache
+from extensions import db
+from models import User, Course, Internship, Enrollment, Submission, TaskSubmission, Certificate
+
+# users.role value -> key in the admin stats payload
+ROLE_KEYS = {"STUDENT": "students", "TRAINER": "trainers", "INTERN": "interns", "ADMIN": "admins"}
+TOTALS = {
+    "courses": Course,
+    "internships": Internship,
+    "enrollments": Enrollment,
+    "submissions": Submission,
+    "task_submissions": TaskSubmission,
+    "certificates": Certificate
+}
+
+platform_stats_cache = TTLCache(1, Config.ADMIN_STATS_CACHE_TTL)
+
+
+def compute_platform_stats():
+    """Every admin counter in one round trip: users grouped by role, UNION ALL a COUNT per table"""
+    parts = [db.session.query(User.role.label("key"), func.count(User.id).label("total")).group_by(User.role)]
+    for key, model in TOTALS.items():
+        parts.append(db.session.query(literal(key).label("key"), func.count(model.id).label("total")))
+
+    stats = {key: 0 for key in list(ROLE_KEYS.values()) + list(TOTALS)}
+    for key, total in db.session.execute(union_all(*[p.statement for p in parts])):
+        stats[ROLE_KEYS.get(key, key)] = total
+    return stats
+
+
+def platform_stats():
+    stats = platform_stats_cache.get("platform")
+    if stats is None:
+        stats = compute_platform_stats()
+        platform_stats_cache.set("platform", stats)
+    return dict(stats)
+
+
+def adjust_platform_stats(key, delta=1):
+    """Keeps the cached counters in step with a create / delete in this worker instead of recounting.
+
+    key is a payload key or a users.role value. Other workers catch up when their entry expires.
+    """
+    key = ROLE_KEYS.get(key, key)
+
+    def adjusted(stats):
+        # A new dict rather than an in-place edit, so a reader copying the old one never sees it change
+        return {**stats, key: max(stats.get(key, 0) + delta, 0)}
+
+    platform_stats_cache.update("platform", adjusted)
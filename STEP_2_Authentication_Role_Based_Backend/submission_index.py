@@ -0,0 +1,44 @@
+from models import Submission, TaskSubmission, QuizSubmission
+
+
+class SubmissionIndex:
+    """A student's submissions keyed by assignment, task and quiz id, built once per request.
+
+    Replaces `next((s for s in submissions if s.assignment_id == ...), None)` scans with dict
+    lookups. The first submission of each item wins, matching what those scans returned.
+    """
+
+    def __init__(self, submissions=(), task_submissions=(), quiz_submissions=()):
+        self.submissions = list(submissions)
+        self.task_submissions = list(task_submissions)
+        self.quiz_submissions = list(quiz_submissions)
+
+        self.by_assignment = {}
+        for s in self.submissions:
+            self.by_assignment.setdefault(s.assignment_id, s)
+
+        self.by_task = {}
+        for ts in self.task_submissions:
+            self.by_task.setdefault(ts.task_id, ts)
+
+        self.by_quiz = {}
+        for qs in self.quiz_submissions:
+            self.by_quiz.setdefault(qs.quiz_id, qs)
+
+    @classmethod
+    def for_student(cls, student_id, assignments=True, tasks=True, quizzes=True):
+        """Loads each requested submission type with a single query"""
+        return cls(
+            Submission.query.filter_by(student_id=student_id).all() if assignments else (),
+            TaskSubmission.query.filter_by(student_id=student_id).all() if tasks else (),
+            QuizSubmission.query.filter_by(student_id=student_id).all() if quizzes else ()
+        )
+
+    def assignment(self, assignment_id):
+        return self.by_assignment.get(assignment_id)
+
+    def task(self, task_id):
+        return self.by_task.get(task_id)
+
+    def quiz(self, quiz_id):
+        return self.by_quiz.get(quiz_id)
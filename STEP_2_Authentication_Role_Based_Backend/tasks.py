@@ -0,0 +1,171 @@
+from datetime import datetime
+
+from sqlalchemy import MetaData, Table, and_, exists, func, insert, inspect, literal, select
+
+from bulk import insert_rows
+from extensions import db
+from models import Enrollment, Task, TaskTemplate, TaskSubmission
+
+# Content columns that moved from tasks onto task_templates
+TEMPLATE_COLUMNS = ("title", "description", "priority", "week_number", "due_date")
+
+
+def create_template(**fields):
+    """Adds the shared content of a new task; flushes so the template has an id to fan out with"""
+    template = TaskTemplate(**fields)
+    db.session.add(template)
+    db.session.flush()
+    return template
+
+
+def assign_template(template, user_ids, status="Pending"):
+    """Gives each user their own slim task row for template, one multi-row INSERT per batch. Returns the count."""
+    return insert_rows(Task, (
+        {
+            "template_id": template.id,
+            "assigned_to": user_id,
+            "assigned_by": template.assigned_by,
+            "course_id": template.course_id,
+            "internship_id": template.internship_id,
+            "status": status
+        }
+        for user_id in dict.fromkeys(int(u) for u in user_ids)
+    ))
+
+
+def backfill_enrollee(user_id, course_id=None, internship_id=None, status="Pending"):
+    """Gives a new enrollee a task row for every template of the course / internship they do not have yet.
+
+    A single INSERT ... SELECT over task_templates, so enrolling costs the same however many
+    tasks the cohort already holds. Returns the number of tasks created.
+    """
+    if not (course_id or internship_id):
+        return 0
+    scope = TaskTemplate.course_id == course_id if course_id else TaskTemplate.internship_id == internship_id
+    owned = exists().where(Task.template_id == TaskTemplate.id, Task.assigned_to == user_id)
+    return db.session.execute(
+        insert(Task).from_select(
+            ["template_id", "assigned_to", "assigned_by", "course_id", "internship_id", "status", "created_at"],
+            select(
+                TaskTemplate.id, literal(int(user_id)), TaskTemplate.assigned_by,
+                TaskTemplate.course_id, TaskTemplate.internship_id, literal(status), literal(datetime.utcnow())
+            ).where(scope, ~owned)
+        )
+    ).rowcount
+
+
+def backfill_task_courses(chunk_size=1000):
+    """Gives legacy tasks without a course or internship the course of the assignee's first course enrollment.
+
+    One UPDATE ... JOIN per chunk of task ids against a derived "first course enrollment per user"
+    table, committed chunk by chunk so locks stay short on large tables. Their templates then follow
+    (backfill_template_courses). Returns the number of tasks updated.
+    """
+    orphan = and_(Task.course_id.is_(None), Task.internship_id.is_(None))
+    low, high = db.session.query(func.min(Task.id), func.max(Task.id)).filter(orphan).one()
+    if low is None:
+        backfill_template_courses()
+        return 0
+
+    first = select(Enrollment.user_id, func.min(Enrollment.id).label("enrollment_id")) \
+        .where(Enrollment.course_id.isnot(None)) \
+        .group_by(Enrollment.user_id).subquery()
+    first_course = select(first.c.user_id, Enrollment.course_id) \
+        .join(Enrollment, Enrollment.id == first.c.enrollment_id).subquery()
+
+    updated = 0
+    for start in range(low, high + 1, chunk_size):
+        updated += db.session.execute(
+            Task.__table__.update()
+            .where(orphan, Task.id >= start, Task.id < start + chunk_size, Task.assigned_to == first_course.c.user_id)
+            .values(course_id=first_course.c.course_id)
+        ).rowcount
+        db.session.commit()
+    backfill_template_courses()
+    return updated
+
+
+def backfill_template_courses():
+    """Gives unscoped templates the course their tasks were backfilled into.
+
+    A template shared by tasks that landed in several courses (or stayed without one) is split:
+    it keeps the first course, or no course while some of its tasks have none, and every other
+    course gets its own copy with those tasks moved onto it. Returns the number of templates changed.
+    """
+    rows = db.session.query(Task.template_id, Task.course_id) \
+        .join(TaskTemplate, TaskTemplate.id == Task.template_id) \
+        .filter(TaskTemplate.course_id.is_(None), TaskTemplate.internship_id.is_(None)) \
+        .distinct().all()
+    courses = {}
+    for template_id, course_id in rows:
+        courses.setdefault(template_id, set()).add(course_id)
+    courses = {template_id: ids for template_id, ids in courses.items() if ids - {None}}
+    if not courses:
+        return 0
+
+    for template in TaskTemplate.query.filter(TaskTemplate.id.in_(courses)):
+        ids = courses[template.id]
+        others = sorted(ids - {None})
+        if None not in ids:
+            template.course_id = others.pop(0)
+        for course_id in others:
+            copy = create_template(
+                assigned_by=template.assigned_by, course_id=course_id, created_at=template.created_at,
+                **{name: getattr(template, name) for name in TEMPLATE_COLUMNS}
+            )
+            Task.query.filter_by(template_id=template.id, course_id=course_id) \
+                .update({Task.template_id: copy.id}, synchronize_session=False)
+    db.session.commit()
+    return len(courses)
+
+
+def migrate_task_templates():
+    """Splits legacy tasks rows (full copy of the content per student) into templates and slim rows.
+
+    One template is created per distinct (trainer, scope, content) group and every row is pointed at
+    it, both set-based. The trainer's own placeholder rows, which only existed to keep a task visible
+    with nobody enrolled, are dropped and so are the content columns. No-op once migrated.
+    """
+    columns = {c["name"] for c in inspect(db.engine).get_columns("tasks")}
+    if "title" not in columns:
+        return 0
+
+    with db.engine.begin() as conn:
+        if "template_id" not in columns:
+            conn.exec_driver_sql("ALTER TABLE tasks ADD COLUMN template_id INTEGER")
+        legacy = Table("tasks", MetaData(), autoload_with=conn)
+        templates = TaskTemplate.__table__
+
+        group = [legacy.c.assigned_by, legacy.c.internship_id, legacy.c.course_id] + \
+                [legacy.c[name] for name in TEMPLATE_COLUMNS]
+        conn.execute(
+            insert(templates).from_select(
+                ["assigned_by", "internship_id", "course_id", *TEMPLATE_COLUMNS, "created_at"],
+                select(*group, func.min(legacy.c.created_at))
+                .where(legacy.c.template_id.is_(None))
+                .group_by(*group)
+            )
+        )
+
+        match = select(func.min(templates.c.id)).where(and_(*[
+            templates.c[col.name].is_not_distinct_from(col) for col in group
+        ])).scalar_subquery()
+        migrated = conn.execute(
+            legacy.update().where(legacy.c.template_id.is_(None)).values(template_id=match)
+        ).rowcount
+
+        submitted = select(TaskSubmission.__table__.c.task_id)
+        conn.execute(legacy.delete().where(
+            legacy.c.assigned_to == legacy.c.assigned_by,
+            legacy.c.id.not_in(submitted)
+        ))
+
+    for name in TEMPLATE_COLUMNS:
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql(f"ALTER TABLE tasks DROP COLUMN {name}")
+    try:
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("CREATE INDEX ix_tasks_template_id ON tasks (template_id)")
+    except Exception:
+        pass
+    return migrated
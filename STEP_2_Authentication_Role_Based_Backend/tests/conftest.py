@@ -0,0 +1,84 @@
+import os
+import sys
+from contextlib import contextmanager
+
+import pytest
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+from sqlalchemy import event
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from config import Config  # noqa: E402
+from extensions import db, mail  # noqa: E402
+from cache import dashboard_cache, trainer_dashboard_cache, name_cache  # noqa: E402
+from stats import platform_stats_cache  # noqa: E402
+from quiz_analytics import quiz_stats_cache  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    """The API blueprints on an in-memory SQLite database, without app.py's MySQL boot"""
+    from auth import auth_bp
+    from course_api import course_bp
+    from trainer_api import trainer_bp
+    from student_api import student_bp
+
+    app = Flask("app", root_path=BACKEND)
+    app.config.from_object(Config)
+    app.config.update(SQLALCHEMY_DATABASE_URI="sqlite://", TESTING=True)
+    db.init_app(app)
+    mail.init_app(app)
+    JWTManager(app)
+    app.register_blueprint(auth_bp, url_prefix="/api/auth")
+    app.register_blueprint(course_bp, url_prefix="/api")
+    app.register_blueprint(trainer_bp, url_prefix="/api")
+    app.register_blueprint(student_bp, url_prefix="/api")
+
+    # Per-process caches outlive a test; ids restart with every fresh database
+    for cache in (dashboard_cache, trainer_dashboard_cache, name_cache, platform_stats_cache, quiz_stats_cache):
+        cache.clear()
+
+    # Requests push their own app context (and get a fresh session), as they do in production;
+    # tests open one themselves around direct database work
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(app):
+    """auth(user_id, role) -> request headers carrying a JWT for that user"""
+    def headers(user_id, role):
+        with app.app_context():
+            token = create_access_token(identity=str(user_id), additional_claims={"role": role})
+        return {"Authorization": f"Bearer {token}"}
+    return headers
+
+
+@pytest.fixture
+def count_queries(app):
+    """with count_queries() as queries: ... -> the SQL statements executed inside the block"""
+    @contextmanager
+    def counter():
+        queries = []
+
+        def record(conn, cursor, statement, *args):
+            queries.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield queries
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+    return counter
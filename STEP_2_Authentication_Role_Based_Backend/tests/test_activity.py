@@ -0,0 +1,37 @@
+from datetime import date, timedelta
+
+from sqlalchemy.dialects import mysql
+
+from activity import ActivityRecorder, streak_update
+from extensions import db
+from models import User
+
+
+def test_streak_is_assigned_before_the_activity_date_on_mysql():
+    sql = str(streak_update([1, 2], date(2024, 3, 2)).compile(dialect=mysql.dialect()))
+    assignments = sql.split(" SET ", 1)[1].split(" WHERE ", 1)[0]
+    assert assignments.index("current_streak=") < assignments.index("last_activity_date=")
+
+
+def test_flush_extends_yesterdays_streak_and_resets_a_broken_one(app):
+    today = date(2024, 3, 2)
+    with app.app_context():
+        db.session.add_all([
+            User(name="Kept", email="kept@x", password="p", role="STUDENT",
+                 current_streak=4, last_activity_date=today - timedelta(days=1)),
+            User(name="Broken", email="broken@x", password="p", role="STUDENT",
+                 current_streak=4, last_activity_date=today - timedelta(days=3)),
+            User(name="Done", email="done@x", password="p", role="STUDENT",
+                 current_streak=2, last_activity_date=today),
+        ])
+        db.session.commit()
+
+    recorder = ActivityRecorder()
+    recorder.app = app
+    for user_id in (1, 2, 3):
+        recorder.record(user_id, today)
+    assert recorder.flush() == 2
+
+    with app.app_context():
+        assert [(u.current_streak, u.last_activity_date) for u in User.query.order_by(User.id)] == \
+            [(5, today), (1, today), (2, today)]
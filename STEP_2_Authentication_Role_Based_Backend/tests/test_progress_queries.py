@@ -0,0 +1,88 @@
+import pytest
+
+from cache import dashboard_cache
+from extensions import db
+from progress import reconcile_progress
+from models import (
+    User, Course, Internship, Enrollment, StudentProgress, Assignment, Submission, Quiz, QuizSubmission,
+    TaskTemplate, Task, TaskSubmission
+)
+
+
+def seed_student(courses, internships):
+    """A student enrolled in that many courses and internships, each with graded work in it"""
+    trainer = User(name="Trainer", email="trainer@x", password="p", role="TRAINER")
+    student = User(name="Student", email="student@x", password="p", role="STUDENT")
+    db.session.add_all([trainer, student])
+    db.session.flush()
+
+    for i in range(courses):
+        course = Course(name=f"Course {i}", start_date="2024-01-01", mentor_name="Trainer", duration="1 month",
+                        trainer_id=trainer.id)
+        db.session.add(course)
+        db.session.flush()
+        db.session.add_all([Enrollment(user_id=student.id, course_id=course.id),
+                            StudentProgress(user_id=student.id, course_id=course.id)])
+        for week in range(1, 4):
+            assignment = Assignment(course_id=course.id, title=f"A{week}", week_number=week, is_released=True)
+            db.session.add(assignment)
+            db.session.flush()
+            db.session.add(Submission(assignment_id=assignment.id, student_id=student.id, grade="80", grade_value=80))
+        quiz = Quiz(course_id=course.id, title="Quiz")
+        db.session.add(quiz)
+        db.session.flush()
+        db.session.add(QuizSubmission(quiz_id=quiz.id, student_id=student.id, score=1, total_questions=1))
+        _assign_task(trainer, student, course_id=course.id)
+
+    for i in range(internships):
+        internship = Internship(intern_name=f"Internship {i}", mentor_name="Trainer", duration="1 month",
+                                trainer_id=trainer.id)
+        db.session.add(internship)
+        db.session.flush()
+        db.session.add(Enrollment(user_id=student.id, internship_id=internship.id))
+        _assign_task(trainer, student, internship_id=internship.id)
+
+    # The write paths keep progress counters current; seeding past them needs one rebuild
+    reconcile_progress()
+    db.session.commit()
+    return student.id
+
+
+def _assign_task(trainer, student, **scope):
+    template = TaskTemplate(title="Task", assigned_by=trainer.id, **scope)
+    db.session.add(template)
+    db.session.flush()
+    task = Task(template_id=template.id, assigned_to=student.id, assigned_by=trainer.id, status="Completed", **scope)
+    db.session.add(task)
+    db.session.flush()
+    db.session.add(TaskSubmission(task_id=task.id, student_id=student.id))
+
+
+def queries_for(app, client, auth, count_queries, path, courses, internships):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        student_id = seed_student(courses, internships)
+    headers = auth(student_id, "STUDENT")
+    dashboard_cache.clear()
+    with count_queries() as queries:
+        response = client.get(path, headers=headers)
+    assert response.status_code == 200
+    return len(queries), response.get_json()
+
+
+@pytest.mark.parametrize("path", ["/api/student/progress", "/api/student/dashboard"])
+def test_query_count_does_not_grow_with_enrollments(app, client, auth, count_queries, path):
+    few, _ = queries_for(app, client, auth, count_queries, path, courses=1, internships=1)
+    many, body = queries_for(app, client, auth, count_queries, path, courses=6, internships=4)
+    assert many == few
+    assert body  # The larger student really was served
+
+
+def test_progress_counts_every_course(app, client, auth):
+    with app.app_context():
+        student_id = seed_student(courses=3, internships=0)
+    rows = client.get("/api/student/progress", headers=auth(student_id, "STUDENT")).get_json()
+    assert len(rows) == 3
+    assert all(r["assignments_completed"] == 3 and r["quizzes_completed"] == 1 and r["tasks_completed"] == 1
+               for r in rows)
@@ -0,0 +1,43 @@
+import threading
+
+from extensions import db
+from models import User, Course, Assignment, Submission
+from stats import adjust_platform_stats, platform_stats, platform_stats_cache
+
+
+def test_concurrent_adjustments_are_not_lost(app):
+    platform_stats_cache.set("platform", {"submissions": 0})
+
+    def submit():
+        for _ in range(1000):
+            adjust_platform_stats("submissions")
+
+    threads = [threading.Thread(target=submit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert platform_stats_cache.get("platform")["submissions"] == 8000
+
+
+def test_deleting_an_assignment_drops_its_submissions_from_the_totals(app, client, auth):
+    with app.app_context():
+        trainer = User(name="Trainer", email="trainer@x", password="p", role="TRAINER")
+        students = [User(name=f"Student {i}", email=f"s{i}@x", password="p", role="STUDENT") for i in range(3)]
+        db.session.add_all([trainer, *students])
+        db.session.flush()
+        course = Course(name="Course", start_date="2024-01-01", mentor_name="Trainer", duration="1 month",
+                        trainer_id=trainer.id)
+        db.session.add(course)
+        db.session.flush()
+        kept, dropped = Assignment(course_id=course.id, title="Kept"), Assignment(course_id=course.id, title="Dropped")
+        db.session.add_all([kept, dropped])
+        db.session.flush()
+        db.session.add_all([Submission(assignment_id=a.id, student_id=s.id) for a in (kept, dropped) for s in students])
+        db.session.commit()
+        trainer_id, dropped_id = trainer.id, dropped.id
+        assert platform_stats()["submissions"] == 6
+
+    response = client.delete(f"/api/trainer/assignment/{dropped_id}", headers=auth(trainer_id, "TRAINER"))
+    assert response.status_code == 200
+    assert platform_stats_cache.get("platform")["submissions"] == 3
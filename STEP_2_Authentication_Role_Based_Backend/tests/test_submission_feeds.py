@@ -0,0 +1,129 @@
+from sqlalchemy import insert, update
+
+from extensions import db
+from models import User, Course, Assignment, Submission, Internship, Task, TaskTemplate, TaskSubmission
+
+
+def seed_course(app, auth, size):
+    """A course with three weekly assignments, each submitted by a cohort of that size"""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        trainer = User(name="Trainer", email="trainer@x", password="p", role="TRAINER")
+        db.session.add(trainer)
+        db.session.flush()
+        course = Course(name="Course", start_date="2024-01-01", mentor_name="Trainer", duration="1 month",
+                        trainer_id=trainer.id)
+        db.session.add(course)
+        db.session.flush()
+        db.session.add_all([Assignment(course_id=course.id, title=f"Week {week}", week_number=week, is_released=True)
+                            for week in range(1, 4)])
+        db.session.commit()
+        trainer_id, course_id = trainer.id, course.id
+        db.session.execute(insert(User), [{"name": f"Student {i}", "email": f"s{i}@x", "password": "p",
+                                           "role": "STUDENT"} for i in range(size)])
+        student_ids = [uid for (uid,) in db.session.query(User.id).filter(User.role == "STUDENT")]
+        db.session.execute(insert(Submission), [{"assignment_id": a.id, "student_id": sid, "status": "Pending"}
+                                                for a in Assignment.query.all() for sid in student_ids])
+        db.session.commit()
+    return auth(trainer_id, "TRAINER"), f"/api/trainer/course/{course_id}/submissions"
+
+
+def seed_internship(app, auth, size):
+    """An internship with three weekly tasks, each submitted by a cohort of that size; the first one graded"""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        trainer = User(name="Trainer", email="trainer@x", password="p", role="TRAINER")
+        db.session.add(trainer)
+        db.session.flush()
+        internship = Internship(intern_name="Internship", mentor_name="Trainer", duration="1 month",
+                                trainer_id=trainer.id)
+        db.session.add(internship)
+        db.session.flush()
+        db.session.add_all([TaskTemplate(title=f"Week {week}", week_number=week, assigned_by=trainer.id,
+                                         internship_id=internship.id) for week in range(1, 4)])
+        db.session.commit()
+        trainer_id, internship_id = trainer.id, internship.id
+        db.session.execute(insert(User), [{"name": f"Intern {i}", "email": f"i{i}@x", "password": "p",
+                                           "role": "STUDENT"} for i in range(size)])
+        student_ids = [uid for (uid,) in db.session.query(User.id).filter(User.role == "STUDENT")]
+        db.session.execute(insert(Task), [{"template_id": t.id, "assigned_to": sid, "assigned_by": trainer_id,
+                                           "internship_id": internship_id}
+                                          for t in TaskTemplate.query.all() for sid in student_ids])
+        db.session.execute(insert(TaskSubmission), [{"task_id": t.id, "student_id": t.assigned_to,
+                                                     "grade": "A" if t.template.week_number == 1 else None}
+                                                    for t in Task.query.all()])
+        db.session.commit()
+    return auth(trainer_id, "TRAINER"), f"/api/trainer/internship/{internship_id}/submissions"
+
+
+def walk(client, headers, url):
+    """Every row of a paginated feed, following X-Next-Cursor page by page"""
+    rows, cursor = [], None
+    while True:
+        response = client.get(url, query_string={"limit": 4, **({"cursor": cursor} if cursor else {})},
+                              headers=headers)
+        assert response.status_code == 200
+        rows.extend(response.get_json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return rows
+
+
+def first_page_queries(client, headers, url, count_queries):
+    with count_queries() as queries:
+        response = client.get(url, query_string={"limit": 4}, headers=headers)
+    assert response.status_code == 200
+    assert len(response.get_json()) == 4
+    return len(queries)
+
+
+def test_course_feed_query_count_does_not_grow_with_submissions(app, client, auth, count_queries):
+    few = first_page_queries(client, *seed_course(app, auth, 3), count_queries)
+    many = first_page_queries(client, *seed_course(app, auth, 30), count_queries)
+    assert many == few
+
+
+def test_course_feed_pages_cover_every_submission_once(app, client, auth):
+    headers, url = seed_course(app, auth, 5)
+    rows = walk(client, headers, url)
+    assert len(rows) == 15
+    assert len({r["submission_id"] for r in rows}) == 15
+    assert all(r["student_name"].startswith("Student") and r["assignment_title"].startswith("Week") for r in rows)
+
+    week = client.get(url, query_string={"week": 2}, headers=headers).get_json()
+    assert {r["assignment_title"] for r in week} == {"Week 2"}
+    assert len(week) == 5
+
+
+def test_feed_pages_past_submissions_without_a_timestamp(app, client, auth):
+    for seed, model in ((seed_course, Submission), (seed_internship, TaskSubmission)):
+        headers, url = seed(app, auth, 5)
+        with app.app_context():
+            # Legacy rows: the first page (limit 4) ends inside the NULL block
+            db.session.execute(update(model).where(model.id <= 5).values(submitted_at=None))
+            db.session.commit()
+        rows = walk(client, headers, url)
+        assert sorted(r["submission_id"] for r in rows) == list(range(1, 16))
+
+
+def test_internship_feed_query_count_does_not_grow_with_submissions(app, client, auth, count_queries):
+    few = first_page_queries(client, *seed_internship(app, auth, 3), count_queries)
+    many = first_page_queries(client, *seed_internship(app, auth, 30), count_queries)
+    assert many == few
+
+
+def test_internship_feed_pages_cover_every_submission_once(app, client, auth):
+    headers, url = seed_internship(app, auth, 5)
+    rows = walk(client, headers, url)
+    assert len(rows) == 15
+    assert len({r["submission_id"] for r in rows}) == 15
+    assert all(r["student_name"].startswith("Intern") and r["task_title"].startswith("Week") for r in rows)
+
+    graded = client.get(url, query_string={"graded": 1, "limit": 2}, headers=headers)
+    assert graded.headers["X-Total-Count"] == "5"
+    pending = client.get(url, query_string={"graded": 0}, headers=headers).get_json()
+    assert len(pending) == 10 and {r["task_title"] for r in pending} == {"Week 2", "Week 3"}
+    week = client.get(url, query_string={"week": 3}, headers=headers).get_json()
+    assert {r["task_title"] for r in week} == {"Week 3"}
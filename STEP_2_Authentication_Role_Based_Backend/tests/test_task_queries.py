@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import insert
+
+from extensions import db
+from models import User, Course, Internship, Enrollment, StudentProgress, Task, TaskSubmission, TaskTemplate
+
+
+def seed_cohort(app, client, auth, size):
+    """A trainer's internship task and course task, each handed out to a cohort of that size and all submitted"""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        trainer = User(name="Trainer", email="trainer@x", password="p", role="TRAINER")
+        db.session.add(trainer)
+        db.session.flush()
+        db.session.add_all([
+            Course(name="Course", start_date="2024-01-01", mentor_name="Trainer", duration="1 month",
+                   trainer_id=trainer.id),
+            Internship(intern_name="Internship", mentor_name="Trainer", duration="1 month", trainer_id=trainer.id),
+        ])
+        db.session.commit()
+        trainer_id = trainer.id
+        db.session.execute(insert(User), [{"name": f"Student {i}", "email": f"s{i}@x", "password": "p",
+                                           "role": "STUDENT"} for i in range(size)])
+        student_ids = [uid for (uid,) in db.session.query(User.id).filter(User.role == "STUDENT")]
+        db.session.execute(insert(StudentProgress), [{"user_id": sid, "course_id": 1} for sid in student_ids])
+        db.session.execute(insert(Enrollment), [{"user_id": sid, "internship_id": 1} for sid in student_ids])
+        db.session.commit()
+
+    headers = auth(trainer_id, "TRAINER")
+    assert client.post("/api/trainer/internship/assign",
+                       json={"title": "Intern task", "internship_id": 1, "due_date": "2024-02-01"},
+                       headers=headers).status_code == 201
+    assert client.post("/api/tasks", json={"title": "Course task", "course_id": 1},
+                       headers=headers).status_code == 201
+
+    with app.app_context():
+        db.session.execute(insert(TaskSubmission), [{"task_id": t.id, "student_id": t.assigned_to}
+                                                    for t in Task.query.all()])
+        db.session.commit()
+        templates = {t.title: t.id for t in TaskTemplate.query.all()}
+    return headers, templates
+
+
+def edit_and_delete(app, client, auth, count_queries, size, title):
+    headers, templates = seed_cohort(app, client, auth, size)
+    template_id = templates[title]
+
+    with count_queries() as updates:
+        response = client.put(f"/api/trainer/task/{template_id}", json={"title": "Renamed"}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()["tasks"] == size
+
+    with count_queries() as deletes:
+        response = client.delete(f"/api/trainer/task/{template_id}", headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()["tasks"] == size
+    assert response.get_json()["submissions"] == size
+    return len(updates), len(deletes)
+
+
+@pytest.mark.parametrize("title", ["Intern task", "Course task"])
+def test_query_count_does_not_grow_with_cohort(app, client, auth, count_queries, title):
+    assert edit_and_delete(app, client, auth, count_queries, 30, title) == \
+        edit_and_delete(app, client, auth, count_queries, 3, title)
+
+
+def test_delete_removes_every_copy(app, client, auth):
+    headers, templates = seed_cohort(app, client, auth, 5)
+    assert client.delete(f"/api/trainer/task/{templates['Course task']}", headers=headers).status_code == 200
+
+    with app.app_context():
+        assert Task.query.count() == 5  # The internship task's copies are untouched
+        assert TaskSubmission.query.count() == 5
+        assert TaskTemplate.query.count() == 1
+        assert {p.total_tasks for p in StudentProgress.query.all()} == {0}
@@ -1,7 +1,18 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import Course, Enrollment, Assignment, Submission, User, CourseResource, StudentProgress, Internship, Task, TaskSubmission, InternshipResource, Quiz, Question, QuizSubmission
+from models import Course, Enrollment, Assignment, Submission, User, CourseResource, StudentProgress, Internship, Task, TaskTemplate, TaskSubmission, InternshipResource, Quiz, Question, QuizSubmission
 from extensions import db
+from sqlalchemy import func, case, and_, not_
+from progress import record_course_item, forget_tasks
+from grades import set_grade, forget_grades
+from pagination import keyset_page
+from quiz_analytics import quiz_analytics, quiz_stats_cache
+from stats import adjust_platform_stats
+from tasks import create_template, assign_template
+from cache import (
+    trainer_dashboard_cache, invalidate_students, invalidate_course, invalidate_internship,
+    invalidate_trainer_course, invalidate_trainer_internship
+)
 from werkzeug.utils import secure_filename
 import os
 
@@ -17,16 +28,65 @@ def trainer_dashboard():
     if not trainer or trainer.role != "TRAINER":
         return jsonify({"error": "Unauthorized"}), 403
 
-    courses = Course.query.filter_by(mentor_name=trainer.name).all()
-    internships = Internship.query.filter_by(mentor_name=trainer.name).all()
+    payload = trainer_dashboard_cache.get(trainer.id)
+    if payload is None:
+        payload = build_trainer_dashboard(trainer)
+        trainer_dashboard_cache.set(trainer.id, payload)
+
+    return jsonify(payload), 200
+
+
+def _grouped_counts(query):
+    return {key: count for key, count in query.all()}
+
+
+def build_trainer_dashboard(trainer):
+    """Course and internship cards with enrollment / submission / pending-grading counts, one GROUP BY per entity type"""
+    courses = Course.query.filter_by(trainer_id=trainer.id).all()
+    internships = Internship.query.filter_by(trainer_id=trainer.id).all()
+    course_ids = [c.id for c in courses]
+    internship_ids = [i.id for i in internships]
+
+    course_students, course_submissions, course_pending = {}, {}, {}
+    if course_ids:
+        course_students = _grouped_counts(
+            db.session.query(Enrollment.course_id, func.count(Enrollment.id))
+            .filter(Enrollment.course_id.in_(course_ids))
+            .group_by(Enrollment.course_id))
+        for cid, total, pending in db.session.query(
+                Assignment.course_id,
+                func.count(Submission.id),
+                func.sum(case((Submission.status == "Pending", 1), else_=0)))\
+                .join(Submission, Submission.assignment_id == Assignment.id)\
+                .filter(Assignment.course_id.in_(course_ids))\
+                .group_by(Assignment.course_id).all():
+            course_submissions[cid] = total
+            course_pending[cid] = int(pending or 0)
+
+    intern_students, intern_submissions, intern_pending = {}, {}, {}
+    if internship_ids:
+        intern_students = _grouped_counts(
+            db.session.query(Enrollment.internship_id, func.count(Enrollment.id))
+            .filter(Enrollment.internship_id.in_(internship_ids))
+            .group_by(Enrollment.internship_id))
+        for iid, total, pending in db.session.query(
+                Task.internship_id,
+                func.count(TaskSubmission.id),
+                func.sum(case((TaskSubmission.status == "Pending", 1), else_=0)))\
+                .join(TaskSubmission, TaskSubmission.task_id == Task.id)\
+                .filter(Task.internship_id.in_(internship_ids))\
+                .group_by(Task.internship_id).all():
+            intern_submissions[iid] = total
+            intern_pending[iid] = int(pending or 0)
 
     course_list = []
     for c in courses:
-        students = Enrollment.query.filter_by(course_id=c.id).count()
         course_list.append({
             "course_id": c.id,
             "course_name": c.name,
-            "students": students,
+            "students": course_students.get(c.id, 0),
+            "submissions": course_submissions.get(c.id, 0),
+            "pending_grading": course_pending.get(c.id, 0),
             "duration": c.duration,
             "assignment_limit": c.assignment_limit,
             "quiz_limit": c.quiz_limit
@@ -34,19 +94,20 @@ def trainer_dashboard():
 
     internship_list = []
     for i in internships:
-        # Assuming Task model tracks assigned_to for interns
-        # For simple parity, we just show the internship name and duration
         internship_list.append({
             "internship_id": i.id,
             "intern_name": i.intern_name,
+            "students": intern_students.get(i.id, 0),
+            "submissions": intern_submissions.get(i.id, 0),
+            "pending_grading": intern_pending.get(i.id, 0),
             "duration": i.duration,
             "assignment_limit": i.assignment_limit
         })
 
-    return jsonify({
+    return {
         "courses": course_list,
         "internships": internship_list
-    }), 200
+    }
 
 
 # ================= INTERNSHIP TASKS =================
@@ -82,12 +143,11 @@ def assign_assignment():
     )
     db.session.add(assignment)
 
-    students = StudentProgress.query.filter_by(course_id=data["course_id"]).all()
-    for s in students:
-        s.total_assignments += 1
+    students = record_course_item(course.id, "assignment")
 
     db.session.commit()
-    return jsonify({"message": "Assignment assigned", "assignment_limit": course.assignment_limit}), 201
+    invalidate_course(course.id)
+    return jsonify({"message": "Assignment assigned", "assignment_limit": course.assignment_limit, "students": students}), 201
 
 
 # ================= COURSE ASSIGNMENTS =================
@@ -119,6 +179,7 @@ def update_assignment(assignment_id):
         assignment.due_date = data["due_date"]
 
     db.session.commit()
+    invalidate_course(assignment.course_id)
     return jsonify({"message": "Assignment updated successfully"}), 200
 
 
@@ -130,10 +191,17 @@ def delete_assignment(assignment_id):
     
     # Optional: Delete associated submissions manually if cascade isn't set
     # (Assuming we want to clean up)
-    Submission.query.filter_by(assignment_id=assignment_id).delete()
+    submitted_by = {sid for (sid,) in db.session.query(Submission.student_id).filter_by(assignment_id=assignment_id).distinct()}
+    record_course_item(assignment.course_id, "assignment", delta=-1, completed_by=submitted_by)
+    forget_grades(Submission.assignment_id == assignment_id)
+
+    submissions = Submission.query.filter_by(assignment_id=assignment_id).delete()
     
     db.session.delete(assignment)
     db.session.commit()
+    adjust_platform_stats("submissions", -submissions)
+    invalidate_course(assignment.course_id)
+    invalidate_trainer_course(assignment.course_id)
     return jsonify({"message": "Assignment deleted successfully"}), 200
 
 
@@ -141,48 +209,78 @@ def delete_assignment(assignment_id):
 @trainer_bp.route("/trainer/assignment/<int:assignment_id>/submissions", methods=["GET"])
 @jwt_required()
 def get_submissions(assignment_id):
-    submissions = Submission.query.filter_by(assignment_id=assignment_id).all()
+    try:
+        rows, next_cursor = _submission_feed(Submission.assignment_id == assignment_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     result = []
-    for s in submissions:
-        student = User.query.get(s.student_id)
-
+    for s, student_name, _ in rows:
         result.append({
             "submission_id": s.id,
-            "student_name": student.name if student else "Unknown",
+            "student_name": student_name or "Unknown",
             "file_url": s.file_path.replace("\\", "/") if s.file_path else "",
             "feedback": s.feedback,
             "grade": s.grade,
             "status": s.status
         })
 
-    return jsonify(result), 200
+    return _page_response(result, next_cursor)
+
+
+def _submission_feed(*criteria):
+    """Submissions with student name and assignment title from one joined query.
+
+    Honours ?status=, ?week= and keyset pagination on (submitted_at, id) via ?limit= and ?cursor=.
+    """
+    query = db.session.query(Submission, User.name, Assignment.title) \
+        .join(Assignment, Assignment.id == Submission.assignment_id) \
+        .outerjoin(User, User.id == Submission.student_id) \
+        .filter(*criteria)
+
+    status = request.args.get("status")
+    if status:
+        query = query.filter(Submission.status == status)
+    week = request.args.get("week", type=int)
+    if week:
+        query = query.filter(Assignment.week_number == week)
+
+    return keyset_page(
+        query, (Submission.submitted_at, Submission.id),
+        key=lambda row: (row[0].submitted_at, row[0].id),
+        cursor=request.args.get("cursor"), limit=request.args.get("limit", type=int)
+    )
+
+
+def _page_response(result, next_cursor):
+    # The body stays a plain list for existing clients; the next page is announced in a header
+    response = jsonify(result)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
 
 # ================= COURSE SUBMISSIONS =================
 @trainer_bp.route("/trainer/course/<int:course_id>/submissions", methods=["GET"])
 @jwt_required()
 def get_course_submissions(course_id):
-    assignments = Assignment.query.filter_by(course_id=course_id).all()
-    assignment_ids = [a.id for a in assignments]
-    
-    submissions = Submission.query.filter(Submission.assignment_id.in_(assignment_ids)).all()
+    try:
+        rows, next_cursor = _submission_feed(Assignment.course_id == course_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     result = []
-    for s in submissions:
-        student = User.query.get(s.student_id)
-        assignment = Assignment.query.get(s.assignment_id)
-
+    for s, student_name, assignment_title in rows:
         result.append({
             "submission_id": s.id,
-            "student_name": student.name if student else "Unknown",
-            "assignment_title": assignment.title if assignment else "Unknown",
+            "student_name": student_name or "Unknown",
+            "assignment_title": assignment_title or "Unknown",
             "file_url": s.file_path.replace("\\", "/") if s.file_path else "",
             "feedback": s.feedback,
             "grade": s.grade,
             "status": s.status
         })
 
-    return jsonify(result), 200
+    return _page_response(result, next_cursor)
 
 # ================= UPDATE SUBMISSION (GRADE, FEEDBACK, STATUS) =================
 @trainer_bp.route("/trainer/submission/update", methods=["POST"])
@@ -195,7 +293,7 @@ def update_submission():
     if "feedback" in data:
         submission.feedback = data["feedback"]
     if "grade" in data:
-        submission.grade = data["grade"]
+        set_grade(submission, data["grade"])
     
     old_status = submission.status
     if "status" in data:
@@ -206,6 +304,8 @@ def update_submission():
 
 
     db.session.commit()
+    invalidate_students(submission.student_id)
+    invalidate_trainer_course(submission.assignment.course_id)
     return jsonify({"message": "Submission updated successfully", "status": submission.status})
 
 # ================= FEEDBACK =================
@@ -216,6 +316,7 @@ def give_feedback():
     submission = Submission.query.get_or_404(data["submission_id"])
     submission.feedback = data["feedback"]
     db.session.commit()
+    invalidate_students(submission.student_id)
     return jsonify({"message": "Feedback saved"})
 
 
@@ -294,6 +395,8 @@ def course_settings(course_id):
             except: course.quiz_limit = None
             
         db.session.commit()
+        invalidate_course(course.id)
+        invalidate_trainer_course(course.id)
         return jsonify({"message": "Settings updated", "assignment_limit": course.assignment_limit, "quiz_limit": course.quiz_limit})
 
     return jsonify({
@@ -306,23 +409,14 @@ def course_settings(course_id):
 @trainer_bp.route("/trainer/internship/<int:internship_id>/tasks", methods=["GET"])
 @jwt_required()
 def get_internship_tasks(internship_id):
-    tasks = Task.query.filter_by(internship_id=internship_id).all()
-    
-    # Filter for unique "templates" (Title + Week)
-    unique_map = {}
-    for t in tasks:
-        key = (t.title, t.week_number)
-        if key not in unique_map:
-            unique_map[key] = t # Keep first instance as the representative
-            
-    unique_tasks = list(unique_map.values())
+    templates = TaskTemplate.query.filter_by(internship_id=internship_id).all()
     
     return jsonify([{
-        "id": t.id, # This ID is just a proxy for the 'template'
+        "id": t.id, # Template id, used by the edit / delete endpoints below
         "title": t.title,
         "week_number": t.week_number,
         "due_date": t.due_date
-    } for t in sorted(unique_tasks, key=lambda x: (x.week_number, x.due_date or ""))])
+    } for t in sorted(templates, key=lambda x: (x.week_number, x.due_date or ""))])
 
 @trainer_bp.route("/trainer/internship/<int:internship_id>/settings", methods=["GET", "POST"])
 @jwt_required()
@@ -340,6 +434,8 @@ def internship_settings(internship_id):
             except: internship.assignment_limit = None
             
         db.session.commit()
+        invalidate_internship(internship.id)
+        invalidate_trainer_internship(internship.id)
         return jsonify({"message": "Internship settings updated", "assignment_limit": internship.assignment_limit})
 
     return jsonify({
@@ -353,7 +449,7 @@ def assign_intern_task():
     internship = Internship.query.get_or_404(data["internship_id"])
     
     # Count UNIQUE weeks or task rounds to prevent limit block
-    unique_weeks = db.session.query(Task.week_number).filter_by(internship_id=internship.id).distinct().count()
+    unique_weeks = db.session.query(TaskTemplate.week_number).filter_by(internship_id=internship.id).distinct().count()
 
     # ✅ Enforce trainer-defined limit (if set)
     if internship.assignment_limit is not None:
@@ -380,117 +476,131 @@ def assign_intern_task():
         
     week_num = unique_weeks + 1
     
+    # The template keeps the task listed for the trainer even with nobody enrolled yet
+    template = create_template(
+        title=data["title"],
+        due_date=data["due_date"],
+        week_number=week_num,
+        internship_id=internship.id,
+        assigned_by=int(get_jwt_identity())
+    )
+
     # Create the task for ALL enrolled interns
-    enrollments = Enrollment.query.filter_by(internship_id=internship.id).all()
-    
-    tasks_created = 0
-    
-    if not enrollments:
-        # If no one enrolled, maybe assign to trainer as a template? 
-        # But for now, let's just log it or assign to self if really needed.
-        # User request implies visibility for interns.
-        pass
-        
-    for enrollment in enrollments:
-        task = Task(
-            title=data["title"],
-            due_date=data["due_date"],
-            week_number=week_num,
-            internship_id=internship.id,
-            assigned_by=get_jwt_identity(),
-            assigned_to=enrollment.user_id 
-        )
-        db.session.add(task)
-        tasks_created += 1
-
-    if tasks_created == 0:
-        # Fallback: Create one for the trainer so it appears in the dashboard
-        # This acts as a "Template" task
-        task = Task(
-            title=data["title"],
-            due_date=data["due_date"],
-            week_number=week_num,
-            internship_id=internship.id,
-            assigned_by=get_jwt_identity(),
-            assigned_to=get_jwt_identity() # Assign to self (Trainer)
-        )
-        db.session.add(task)
-        pass
+    enrolled = db.session.query(Enrollment.user_id).filter_by(internship_id=internship.id)
+    count = assign_template(template, [user_id for (user_id,) in enrolled])
         
     db.session.commit()
-    return jsonify({"message": "Task assigned"}), 201
+    invalidate_internship(internship.id)
+    return jsonify({"message": "Task assigned", "assigned": count}), 201
 
 @trainer_bp.route("/trainer/task/<int:task_id>", methods=["PUT"])
 @jwt_required()
 def update_intern_task(task_id):
     data = request.get_json()
-    # Find the 'template' task
-    template_task = Task.query.get_or_404(task_id)
-    
-    # Find all tasks that match this template (Same Internship, Title, Week)
-    # We update ALL of them to keep them in sync
-    sisters = Task.query.filter_by(
-        internship_id=template_task.internship_id,
-        title=template_task.title, 
-        week_number=template_task.week_number
-    ).all()
+    # task_id is the template id listed by get_internship_tasks; every intern's copy reads from it,
+    # so the edit is one UPDATE of the template row however many interns hold the task
+    template = TaskTemplate.query.get_or_404(task_id)
     
-    for t in sisters:
-        if "title" in data: t.title = data["title"]
-        if "due_date" in data: t.due_date = data["due_date"]
-        
+    if "title" in data: template.title = data["title"]
+    if "due_date" in data: template.due_date = data["due_date"]
+
+    assignees = [user_id for (user_id,) in db.session.query(Task.assigned_to).filter_by(template_id=template.id)]
     db.session.commit()
-    return jsonify({"message": f"Updated {len(sisters)} tasks"}), 200
+    invalidate_students(*assignees)
+    return jsonify({"message": f"Updated {len(assignees)} tasks", "tasks": len(assignees)}), 200
 
 @trainer_bp.route("/trainer/task/<int:task_id>", methods=["DELETE"])
 @jwt_required()
 def delete_intern_task(task_id):
-    template_task = Task.query.get_or_404(task_id)
+    template = TaskTemplate.query.get_or_404(task_id)
     
-    # Find all sister tasks to delete
-    sisters = Task.query.filter_by(
-        internship_id=template_task.internship_id,
-        title=template_task.title, 
-        week_number=template_task.week_number
-    ).all()
+    # Every intern's copy of the template goes with it: submissions, then tasks, then the template,
+    # each as one set-based DELETE inside the same transaction
+    sisters = Task.template_id == template.id
+    assignees = [user_id for (user_id,) in db.session.query(Task.assigned_to).filter(sisters)]
     
-    count = 0
-    for t in sisters:
-        # Manually delete submissions first due to missing cascade
-        TaskSubmission.query.filter_by(task_id=t.id).delete()
-        db.session.delete(t)
-        count += 1
+    forget_tasks(sisters)
+
+    submissions = TaskSubmission.query \
+        .filter(TaskSubmission.task_id.in_(db.session.query(Task.id).filter(sisters))) \
+        .delete(synchronize_session=False)
+    count = Task.query.filter(sisters).delete(synchronize_session=False)
+    db.session.delete(template)
     
     db.session.commit()
-    return jsonify({"message": f"Deleted {count} tasks"}), 200
+    adjust_platform_stats("task_submissions", -submissions)
+    invalidate_students(*assignees)
+    invalidate_trainer_internship(template.internship_id)
+    return jsonify({"message": f"Deleted {count} tasks", "tasks": count, "submissions": submissions}), 200
 
 # ================= INTERNSHIP SUBMISSIONS =================
 @trainer_bp.route("/trainer/internship/<int:internship_id>/submissions", methods=["GET"])
 @jwt_required()
 def get_internship_submissions(internship_id):
-    tasks = Task.query.filter_by(internship_id=internship_id).all()
-    task_ids = [t.id for t in tasks]
-    
-    submissions = TaskSubmission.query.filter(TaskSubmission.task_id.in_(task_ids)).all()
+    """Task submissions of an internship from one joined query over task_submissions, tasks and users.
+
+    Filters: ?status=, ?graded=1|0, ?week=, ?task_id=, ?template_id=. Keyset pagination on (submitted_at, id) via
+    ?limit= and ?cursor=; a paginated response also carries the filtered total in X-Total-Count.
+    """
+    criteria = [Task.internship_id == internship_id]
+
+    status = request.args.get("status")
+    if status:
+        criteria.append(TaskSubmission.status == status)
+    graded = request.args.get("graded")
+    if graded is not None:
+        is_graded = and_(TaskSubmission.grade.isnot(None), TaskSubmission.grade != "")
+        criteria.append(is_graded if graded.lower() in ("1", "true", "yes") else not_(is_graded))
+    week = request.args.get("week", type=int)
+    if week:
+        criteria.append(TaskTemplate.week_number == week)
+    task_id = request.args.get("task_id", type=int)
+    if task_id:
+        criteria.append(TaskSubmission.task_id == task_id)
+    template_id = request.args.get("template_id", type=int)
+    if template_id:
+        criteria.append(Task.template_id == template_id)
+
+    query = db.session.query(TaskSubmission, User.name, TaskTemplate.title, Task.template_id) \
+        .join(Task, Task.id == TaskSubmission.task_id) \
+        .join(TaskTemplate, TaskTemplate.id == Task.template_id) \
+        .outerjoin(User, User.id == TaskSubmission.student_id) \
+        .filter(*criteria)
+
+    limit = request.args.get("limit", type=int)
+    try:
+        rows, next_cursor = keyset_page(
+            query, (TaskSubmission.submitted_at, TaskSubmission.id),
+            key=lambda row: (row[0].submitted_at, row[0].id),
+            cursor=request.args.get("cursor"), limit=limit
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     result = []
-    for s in submissions:
-        student = User.query.get(s.student_id)
-        task = Task.query.get(s.task_id)
-
+    for s, student_name, task_title, template_id in rows:
         result.append({
             "submission_id": s.id,
             "student_id": s.student_id,
             "task_id": s.task_id,
-            "student_name": student.name if student else "Unknown",
-            "task_title": task.title if task else "Unknown",
+            "template_id": template_id,
+            "student_name": student_name or "Unknown",
+            "task_title": task_title or "Unknown",
             "file_url": s.file_path.replace("\\", "/") if s.file_path else "",
             "feedback": s.feedback,
             "grade": s.grade,
             "status": s.status
         })
 
-    return jsonify(result), 200
+    response, code = _page_response(result, next_cursor)
+    if limit:
+        # Separate COUNT over the indexed task tables, without the users join or row payload
+        total = db.session.query(func.count(TaskSubmission.id)) \
+            .join(Task, Task.id == TaskSubmission.task_id) \
+            .join(TaskTemplate, TaskTemplate.id == Task.template_id) \
+            .filter(*criteria).scalar()
+        response.headers["X-Total-Count"] = str(total)
+    return response, code
 
 @trainer_bp.route("/trainer/task_submission/update", methods=["POST"])
 @jwt_required()
@@ -499,9 +609,7 @@ def update_task_submission():
     submission = TaskSubmission.query.get_or_404(data["submission_id"])
     
     if "feedback" in data: submission.feedback = data["feedback"]
-    if "grade" in data: submission.grade = data["grade"]
-    if "feedback" in data: submission.feedback = data["feedback"]
-    if "grade" in data: submission.grade = data["grade"]
+    if "grade" in data: set_grade(submission, data["grade"])
     if "status" in data: 
         submission.status = data["status"] # Allow status update
         
@@ -512,6 +620,9 @@ def update_task_submission():
 
 
     db.session.commit()
+    invalidate_students(submission.student_id)
+    task = Task.query.get(submission.task_id)
+    invalidate_trainer_internship(task.internship_id if task else None)
     return jsonify({"message": "Task Submission updated", "status": submission.status})
 
 
@@ -582,32 +693,47 @@ def assign_quiz():
         )
         db.session.add(question)
 
+    record_course_item(course.id, "quiz")
+
     db.session.commit()
+    invalidate_course(course.id)
     return jsonify({"message": "Quiz assigned successfully"}), 201
 
 @trainer_bp.route("/trainer/quiz/<int:quiz_id>", methods=["DELETE"])
 @jwt_required()
 def delete_quiz(quiz_id):
     quiz = Quiz.query.get_or_404(quiz_id)
+    attempted_by = {sid for (sid,) in db.session.query(QuizSubmission.student_id).filter_by(quiz_id=quiz_id).distinct()}
+    record_course_item(quiz.course_id, "quiz", delta=-1, completed_by=attempted_by)
     db.session.delete(quiz)
     db.session.commit()
+    invalidate_course(quiz.course_id)
+    quiz_stats_cache.delete(quiz_id)
     return jsonify({"message": "Quiz deleted"}), 200
 
 @trainer_bp.route("/trainer/quiz/<int:quiz_id>/results", methods=["GET"])
 @jwt_required()
 def get_quiz_results(quiz_id):
-    submissions = QuizSubmission.query.filter_by(quiz_id=quiz_id).all()
+    rows = db.session.query(QuizSubmission, User.name) \
+        .outerjoin(User, User.id == QuizSubmission.student_id) \
+        .filter(QuizSubmission.quiz_id == quiz_id) \
+        .order_by(QuizSubmission.id).all()
     result = []
-    for s in submissions:
-        student = User.query.get(s.student_id)
+    for s, student_name in rows:
         result.append({
-            "student_name": student.name if student else "Unknown",
+            "student_name": student_name or "Unknown",
             "score": s.score,
             "total": s.total_questions,
             "submitted_at": s.submitted_at.strftime("%Y-%m-%d %H:%M")
         })
     return jsonify(result), 200
 
+@trainer_bp.route("/trainer/quiz/<int:quiz_id>/analytics", methods=["GET"])
+@jwt_required()
+def get_quiz_analytics(quiz_id):
+    quiz = Quiz.query.get_or_404(quiz_id)
+    return jsonify(quiz_analytics(quiz)), 200
+
 # ================= AI QUIZ IMPORT =================
 @trainer_bp.route("/trainer/quiz/import-ai", methods=["POST"])
 @jwt_required()
@@ -680,7 +806,10 @@ def import_quiz_ai():
         )
         db.session.add(question)
 
+    record_course_item(course.id, "quiz")
+
     db.session.commit()
+    invalidate_course(course.id)
     
     return jsonify({
         "message": "Quiz successfully imported with AI!",
@@ -0,0 +1,51 @@
+from sqlalchemy import func
+
+from extensions import db
+from models import User, Course, Internship
+
+
+def trainer_named(name):
+    """The trainer with exactly this name, or None when there is no match or the name is shared"""
+    if not name:
+        return None
+    matches = User.query.filter_by(role="TRAINER", name=name.strip()).limit(2).all()
+    return matches[0] if len(matches) == 1 else None
+
+
+def apply_trainer(entity, data):
+    """Links a course / internship to its trainer from an admin payload.
+
+    An explicit trainer_id wins and also refreshes the display mentor_name; a bare mentor_name is
+    linked only when exactly one trainer carries it. Returns False for an unknown trainer_id.
+    """
+    if data.get("trainer_id"):
+        trainer = User.query.filter_by(id=data["trainer_id"], role="TRAINER").first()
+        if not trainer:
+            return False
+        entity.trainer_id = trainer.id
+        entity.mentor_name = trainer.name
+    elif "mentor_name" in data and (data["mentor_name"] != entity.mentor_name or entity.trainer_id is None):
+        entity.mentor_name = data["mentor_name"]
+        trainer = trainer_named(data["mentor_name"])
+        entity.trainer_id = trainer.id if trainer else None
+    return True
+
+
+def backfill_trainer_ids(name=None):
+    """Links unowned courses / internships to the trainer whose name matches mentor_name.
+
+    One correlated UPDATE per table; names shared by several trainers are left unlinked for an admin
+    to resolve. Pass name to only claim rows for a single (e.g. newly registered) trainer.
+    """
+    linked = 0
+    for model in (Course, Internship):
+        match = db.session.query(func.min(User.id)) \
+            .filter(User.role == "TRAINER", User.name == model.mentor_name) \
+            .having(func.count(User.id) == 1) \
+            .scalar_subquery()
+        query = model.query.filter(model.trainer_id.is_(None), match.isnot(None))
+        if name:
+            query = query.filter(model.mentor_name == name)
+        linked += query.update({model.trainer_id: match}, synchronize_session=False)
+    db.session.commit()
+    return linked
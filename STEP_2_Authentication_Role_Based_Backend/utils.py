@@ -42,3 +42,26 @@ def parse_duration_to_days(duration_str):
         return 60
     except:
         return 60
+
+GRADE_MAP = {"A+": 100, "A": 95, "A-": 90, "B+": 85, "B": 80, "B-": 75, "C": 70, "D": 60, "F": 0}
+
+def parse_grade(grade):
+    """Normalizes a free-text grade ("A-", "90/100", "87.5") to a 0-100 number, or None"""
+    if not grade:
+        return None
+    try:
+        # 1. Try Map First (e.g. "A")
+        sg = str(grade).strip().upper()
+        if sg in GRADE_MAP:
+            return float(GRADE_MAP[sg])
+
+        # 2. Try Regex (e.g. "90/100")
+        import re
+        match = re.search(r"(\d+(\.\d+)?)", str(grade))
+        if match:
+            val = float(match.group(1))
+            if val <= 100: # Sanity check
+                return val
+    except:
+        pass
+    return None
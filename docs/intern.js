@@ -134,6 +134,27 @@ async function loadProgressPage() {
     }
 }
 
+// Certificates render in the background: follow the job until the PDF is ready
+const CERTIFICATE_POLL_LIMIT = 120; // ~2 minutes at one poll per second
+
+async function waitForCertificate(res) {
+    let data = await res.json();
+    if (!res.ok || !data.job_id) return { ok: res.ok, data };
+
+    for (let attempt = 0; data.status === 'queued' || data.status === 'running'; attempt++) {
+        if (attempt >= CERTIFICATE_POLL_LIMIT) {
+            return { ok: false, data: { error: 'Certificate is taking too long. Please try again in a few minutes.' } };
+        }
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const poll = await fetch(`${API_BASE}/certificate/jobs/${data.job_id}`, {
+            headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
+        });
+        data = await poll.json();
+        if (!poll.ok) return { ok: false, data };
+    }
+    return { ok: data.status === 'done', data };
+}
+
 async function downloadCertificateForInternship(internshipId, btn) {
     const originalContent = btn.innerHTML;
     btn.innerHTML = 'Generating... <i class="fa-solid fa-spinner fa-spin"></i>';
@@ -148,9 +169,9 @@ async function downloadCertificateForInternship(internshipId, btn) {
             },
             body: JSON.stringify({ internship_id: internshipId })
         });
-        const data = await res.json();
+        const { ok, data } = await waitForCertificate(res);
 
-        if (res.ok) {
+        if (ok) {
             const fullUrl = API_BASE.replace('/api', '') + data.url;
             window.open(fullUrl, '_blank');
             btn.innerHTML = 'Downloaded <i class="fa-solid fa-check"></i>';
@@ -181,9 +202,9 @@ async function downloadCertificate(btn) {
             method: 'POST',
             headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
         });
-        const data = await res.json();
+        const { ok, data } = await waitForCertificate(res);
 
-        if (res.ok) {
+        if (ok) {
             const fullUrl = API_BASE.replace('/api', '') + data.url;
             window.open(fullUrl, '_blank');
             btn.innerHTML = 'Downloaded <i class="fa-solid fa-check"></i>';
@@ -548,9 +569,9 @@ async function generateCertificateForDashboard(btn, msgDiv) {
             method: 'POST',
             headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
         });
-        const data = await res.json();
+        const { ok, data } = await waitForCertificate(res);
 
-        if (res.ok) {
+        if (ok) {
             msgDiv.innerHTML = `<a href="${API_BASE.replace('/api', '') + data.url}" target="_blank" class="btn-primary" style="background: #22c55e; color:white; padding: 10px 20px; display: inline-block; margin-top: 10px; text-decoration: none; border-radius: 8px;">Download PDF <i class="fa-solid fa-download"></i></a>`;
             btn.innerHTML = "Certificate Ready ✅";
             btn.style.display = 'none';
@@ -764,9 +785,9 @@ async function generateCertificate() {
             method: 'POST',
             headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
         });
-        const data = await res.json();
+        const { ok, data } = await waitForCertificate(res);
 
-        if (res.ok) {
+        if (ok) {
             // Student Style: Open directly
             const fullUrl = API_BASE.replace('/api', '') + data.url;
             window.open(fullUrl, '_blank');
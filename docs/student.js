@@ -488,9 +488,23 @@ async function generateCertificate(courseId) {
       headers: { "Authorization": `Bearer ${token}` }
     });
 
-    const data = await res.json();
+    let data = await res.json();
 
-    if (res.ok) {
+    // Rendering runs in the background: follow the job until the PDF is ready, for ~2 minutes at most
+    for (let attempt = 0; res.ok && (data.status === "queued" || data.status === "running"); attempt++) {
+      if (attempt >= 120) {
+        data = { error: "Certificate is taking too long. Please try again in a few minutes." };
+        break;
+      }
+      await new Promise(resolve => setTimeout(resolve, 1000));
+      const poll = await fetch(`${API}/certificate/jobs/${data.job_id}`, {
+        headers: { "Authorization": `Bearer ${token}` }
+      });
+      data = await poll.json();
+      if (!poll.ok) break;
+    }
+
+    if (res.ok && data.status === "done") {
       if (msg) msg.innerHTML = `<span class="text-green-600">Certificate Ready! Refreshing...</span>`;
       // Refresh to update the list with the new URL
       setTimeout(() => loadAssignments(), 1000);
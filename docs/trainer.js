@@ -907,7 +907,7 @@ async function loadInternshipSubmissions() {
 
   // ✅ Client-side filtering
   const filteredData = filterTaskId
-    ? data.filter(s => s.task_id === filterTaskId)
+    ? data.filter(s => s.template_id === filterTaskId) // Task list ids are template ids
     : data; // Show all if no filter
 
   if (filterTaskId && filteredData.length === 0) {